@@ -0,0 +1,161 @@
+import heapq
+from datetime import timedelta
+
+
+class DeadlineRiskTracker:
+    # Tracks the slack (deadline minus projected arrival) of every Package with a deadline. Slack is updated one
+    # route at a time, so only the Packages on a route that changed are recomputed. The summary metrics are kept up
+    # to date on every update and the most at-risk Packages are kept in a min-heap ordered by slack
+    def __init__(self, deadlines):
+        # Deadline of every Package, Packages without a deadline (EOD) are not tracked
+        self.deadlines = {package_id: deadline for package_id, deadline in deadlines.items() if deadline is not None}
+
+        self.slack = {}
+        self.package_route = {}
+        self.route_packages = {}
+
+        # Arrivals last recorded for every route, so that a route simulated again with the same arrivals is skipped
+        self.route_arrivals = {}
+
+        # Heap entries are (slack in seconds, version, package_id). Updating a Package bumps its version, which
+        # leaves its older heap entries stale; stale entries are skipped and discarded lazily
+        self.heap = []
+        self.versions = {}
+
+        self.late_count = 0
+        self.total_lateness = timedelta(0)
+
+    # Space-Time Complexity: O(1)
+    # Removes the contribution of the Package to the summary metrics
+    def clear_package(self, package_id):
+        slack = self.slack.pop(package_id, None)
+        if slack is None:
+            return
+
+        if slack < timedelta(0):
+            self.late_count -= 1
+            self.total_lateness += slack
+        self.versions[package_id] = self.versions.get(package_id, 0) + 1
+
+        route_key = self.package_route.pop(package_id)
+        if route_key in self.route_packages:
+            self.route_packages[route_key].discard(package_id)
+        self.route_arrivals.pop(route_key, None)
+
+    # Space-Time Complexity: O(1)
+    # Sets the deadline of the Package, None if it has no deadline. The Package is tracked again the next time its
+    # route is updated
+    def set_deadline(self, package_id, deadline):
+        if self.deadlines.get(package_id) == deadline:
+            return
+
+        self.clear_package(package_id)
+        if deadline is None:
+            self.deadlines.pop(package_id, None)
+        else:
+            self.deadlines[package_id] = deadline
+
+        # A Package without a tracked slack is not linked to its route, so every route is recorded again
+        self.route_arrivals.clear()
+
+    # Space-Time Complexity: O(log N)
+    # Records the projected arrival of the Package on the route
+    def set_package_arrival(self, route_key, package_id, arrival):
+        deadline = self.deadlines.get(package_id)
+        if deadline is None:
+            return
+
+        # A Package that moved from another route stops counting towards the old route
+        self.clear_package(package_id)
+
+        slack = deadline - arrival
+        self.slack[package_id] = slack
+        self.package_route[package_id] = route_key
+        self.route_packages.setdefault(route_key, set()).add(package_id)
+
+        if slack < timedelta(0):
+            self.late_count += 1
+            self.total_lateness -= slack
+
+        version = self.versions.get(package_id, 0) + 1
+        self.versions[package_id] = version
+        heapq.heappush(self.heap, (slack.total_seconds(), version, package_id))
+
+        # Rebuild the heap when stale entries start to outnumber the tracked Packages
+        if len(self.heap) > 2 * len(self.slack) + 64:
+            self.heap = [(tracked_slack.total_seconds(), self.versions[tracked_id], tracked_id)
+                         for tracked_id, tracked_slack in self.slack.items()]
+            heapq.heapify(self.heap)
+
+    # Space-Time Complexity: O(R log N) where R is the number of Packages on the route, O(R) if unchanged
+    # Replaces the projected arrivals of a route with a list of (package_id, arrival) pairs. Packages that are no
+    # longer on the route stop being tracked. A route with the same arrivals as last time is left untouched
+    def update_route(self, route_key, arrivals):
+        arrivals = list(arrivals)
+        if self.route_arrivals.get(route_key) == arrivals:
+            return
+
+        self.remove_route(route_key)
+        for package_id, arrival in arrivals:
+            self.set_package_arrival(route_key, package_id, arrival)
+        self.route_arrivals[route_key] = arrivals
+
+    # Space-Time Complexity: O(R) where R is the number of Packages on the route
+    # Stops tracking every Package on the route
+    def remove_route(self, route_key):
+        for package_id in list(self.route_packages.pop(route_key, ())):
+            self.clear_package(package_id)
+        self.route_arrivals.pop(route_key, None)
+
+    # Space-Time Complexity: O(1)
+    # Returns the keys of every route that currently has tracked Packages or recorded arrivals
+    def get_route_keys(self):
+        route_keys = set(self.route_arrivals)
+        route_keys.update(route_key for route_key, package_ids in self.route_packages.items() if len(package_ids) > 0)
+        return list(route_keys)
+
+    # Space-Time Complexity: O(1) amortized
+    # Discards stale entries from the top of the heap
+    def discard_stale_entries(self):
+        while len(self.heap) > 0:
+            slack_seconds, version, package_id = self.heap[0]
+            if package_id in self.slack and self.versions[package_id] == version:
+                return
+            heapq.heappop(self.heap)
+
+    # Space-Time Complexity: O(1) amortized
+    # Returns the smallest slack of all tracked Packages, or None if no Package is tracked
+    def get_min_slack(self):
+        self.discard_stale_entries()
+        if len(self.heap) == 0:
+            return None
+        return self.slack[self.heap[0][2]]
+
+    # Space-Time Complexity: O(K log N)
+    # Returns up to K (package_id, slack) pairs with the smallest slack, most at risk first
+    def get_most_at_risk(self, k):
+        at_risk = []
+        popped = []
+
+        while len(self.heap) > 0 and len(at_risk) < k:
+            entry = heapq.heappop(self.heap)
+            slack_seconds, version, package_id = entry
+            if package_id in self.slack and self.versions[package_id] == version:
+                at_risk.append((package_id, self.slack[package_id]))
+                popped.append(entry)
+
+        # Put the valid entries back so the heap is unchanged
+        for entry in popped:
+            heapq.heappush(self.heap, entry)
+
+        return at_risk
+
+    # Space-Time Complexity: O(1) amortized
+    # Returns the summary metrics of every tracked Package
+    def get_summary(self):
+        return {
+            "tracked": len(self.slack),
+            "late_count": self.late_count,
+            "total_lateness": self.total_lateness,
+            "min_slack": self.get_min_slack()
+        }
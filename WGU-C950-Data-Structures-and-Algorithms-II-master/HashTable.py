@@ -1,60 +1,101 @@
+# Highest fraction of buckets that may be occupied or marked as removed. Quadratic probing over a prime number of
+# buckets is guaranteed to find an empty bucket while the table is at most half full
+max_load_factor = 0.5
+
+
+# Space-Time Complexity: O(sqrt(N)) per candidate number
+# Returns the smallest prime number that is greater than or equal to the provided number
+def get_next_prime(number):
+    candidate = max(number, 2)
+    while any(candidate % divisor == 0 for divisor in range(2, int(candidate ** 0.5) + 1)):
+        candidate = candidate + 1
+    return candidate
+
+
 class HashTable:
-    # Linear Probing HashTable constructor with an optional initial capacity used to store the Packages
-    # Linear Probing is used to decrease the number of collisions for each insertion
+    # Quadratic Probing HashTable constructor with an optional initial capacity used to store the Packages
+    # The number of buckets is rounded up to a prime number so that the probe sequence visits enough distinct buckets
     def __init__(self, initial_capacity=40, c1=0, c2=1):
-        self.initial_capacity = initial_capacity
-        self.package_table = [None] * initial_capacity
-        self.bucket_status_table = ["EMPTY_SINCE_START"] * initial_capacity
+        self.initial_capacity = get_next_prime(initial_capacity)
+        self.package_table = [None] * self.initial_capacity
+        self.bucket_status_table = ["EMPTY_SINCE_START"] * self.initial_capacity
 
-        # Double hashing constants
+        # Quadratic probing constants
         self.c1 = c1
         self.c2 = c2
 
+        # Number of Packages stored and number of buckets marked as removed
+        self.count = 0
+        self.removed_count = 0
+
+
+    # Space-Time Complexity: O(1)
+    # Returns the index of the bucket probed for the key after i collisions
+    def get_bucket(self, key, i):
+        return (hash(key) + (self.c1 * i) + (self.c2 * i ** 2)) % len(self.package_table)
+
 
     # Inserts a new item into the HashTable The key of the item will be the id_number and the value will be all the
-    # corresponding components tied to that id_number
+    # corresponding components tied to that id_number. An item with the same key is replaced
     def insert(self, package):
+        # Grow the HashTable (or clear the buckets marked as removed) before it is more than half full
+        if (self.count + self.removed_count + 1) > len(self.package_table) * max_load_factor:
+            self.resize()
+
         i = 0
         buckets_probed = 0
         N = len(self.package_table)
-        bucket = hash(package.id_number) % N
+        bucket = self.get_bucket(package.id_number, i)
+        free_bucket = None
 
-        # Iterate through the HashTable and insert the package at the next empty bucket
+        # Iterate through the HashTable until the key or a bucket that was never used is found. The package is
+        # inserted at the first free bucket along the way
         while buckets_probed < N:
-            # Insert package in next empty bucket
-            if self.bucket_status_table[bucket] == "EMPTY_SINCE_START" or self.bucket_status_table[bucket] == "EMPTY_AFTER_REMOVAL":
-                self.package_table[bucket] = package
-                self.bucket_status_table[bucket] = "OCCUPIED"
-                return True
-
-            # No empty bucket found yet, increment i and compute next bucket's index
+            if self.bucket_status_table[bucket] == "OCCUPIED":
+                # Replace the package with the same key
+                if self.package_table[bucket].id_number == package.id_number:
+                    self.package_table[bucket] = package
+                    return True
+            else:
+                if free_bucket is None:
+                    free_bucket = bucket
+                if self.bucket_status_table[bucket] == "EMPTY_SINCE_START":
+                    break
+
+            # Key not found yet, increment i and compute next bucket's index
             i = i + 1
-            bucket = (hash(package.id_number) + (self.c1 * i) + (self.c2 * i ** 2)) % N
+            bucket = self.get_bucket(package.id_number, i)
 
             # Increment number of buckets probed
             buckets_probed = buckets_probed + 1
 
         # Iterated through the entire HashTable and could not insert the item, resize HashTable and re-insert
-        self.resize()
-        self.insert(package)
+        if free_bucket is None:
+            self.resize()
+            return self.insert(package)
+
+        if self.bucket_status_table[free_bucket] == "EMPTY_AFTER_REMOVAL":
+            self.removed_count = self.removed_count - 1
+        self.package_table[free_bucket] = package
+        self.bucket_status_table[free_bucket] = "OCCUPIED"
+        self.count = self.count + 1
         return True
 
 
-    # Searches for an item with a matching key in the hashtable. Returns the
-    # item if found, or None if not found.
-    def lookup(self, key):
+    # Returns the index of the bucket holding the item with a matching key, or None if not found
+    def find_bucket(self, key):
         i = 0
         buckets_probed = 0
         N = len(self.package_table)
-        bucket = hash(key) % N
+        bucket = self.get_bucket(key, i)
 
         while (self.bucket_status_table[bucket] != "EMPTY_SINCE_START") and (buckets_probed < N):
             if (self.package_table[bucket] is not None) and (self.package_table[bucket].id_number == key):
-                return self.package_table[bucket]
+                return bucket
 
             # Increment i and recompute bucket index
             i = i + 1
-            bucket = (hash(key) + self.c1 * i + self.c2 * i ** 2) % N
+            bucket = self.get_bucket(key, i)
 
             # Increment number of buckets probed
             buckets_probed = buckets_probed + 1
@@ -62,18 +103,74 @@ class HashTable:
         return None
 
 
-    # Resizes the HashTable by doubling its original size
+    # Searches for an item with a matching key in the hashtable. Returns the
+    # item if found, or None if not found.
+    def lookup(self, key):
+        bucket = self.find_bucket(key)
+        if bucket is None:
+            return None
+        return self.package_table[bucket]
+
+
+    # Removes the item with a matching key from the HashTable. The bucket is marked as removed so that lookups of
+    # other keys continue probing past it. Returns the removed item, or None if not found
+    def remove(self, key):
+        bucket = self.find_bucket(key)
+        if bucket is None:
+            return None
+
+        package = self.package_table[bucket]
+        self.package_table[bucket] = None
+        self.bucket_status_table[bucket] = "EMPTY_AFTER_REMOVAL"
+        self.count = self.count - 1
+        self.removed_count = self.removed_count + 1
+        return package
+
+
+    # Returns the number of buckets that the lookup of the key probes, whether or not the key is found
+    def get_probe_length(self, key):
+        buckets_probed = 0
+        N = len(self.package_table)
+        bucket = self.get_bucket(key, 0)
+
+        while (self.bucket_status_table[bucket] != "EMPTY_SINCE_START") and (buckets_probed < N):
+            buckets_probed = buckets_probed + 1
+            if (self.package_table[bucket] is not None) and (self.package_table[bucket].id_number == key):
+                return buckets_probed
+            bucket = self.get_bucket(key, buckets_probed)
+
+        return buckets_probed + 1
+
+
+    # Returns the fraction of buckets that hold an item
+    def get_load_factor(self):
+        return self.count / len(self.package_table)
+
+
+    # Resizes the HashTable by doubling its original size. When most buckets are only marked as removed, the items
+    # are re-inserted into a HashTable of the same size instead, which clears the removed buckets
     def resize(self):
-        # Create a HashTable with double the initial capacity
-        resized_ht = HashTable(initial_capacity=self.initial_capacity * 2, c1 = self.c1, c2 = self.c2)
+        if (self.count + 1) * 4 > len(self.package_table):
+            new_capacity = self.initial_capacity * 2
+        else:
+            new_capacity = self.initial_capacity
+        resized_ht = HashTable(initial_capacity=new_capacity, c1 = self.c1, c2 = self.c2)
 
-        # Iterate through the current HashTable and copy the Packages to the new HashTable
-        for package in self.package_table:
-            resized_ht.insert(package)
+        # Iterate through the current HashTable and copy the Packages to the new HashTable, skipping empty buckets
+        for bucket, package in enumerate(self.package_table):
+            if self.bucket_status_table[bucket] == "OCCUPIED":
+                resized_ht.insert(package)
 
         self.initial_capacity = resized_ht.initial_capacity
         self.package_table = resized_ht.package_table
         self.bucket_status_table = resized_ht.bucket_status_table
+        self.count = resized_ht.count
+        self.removed_count = resized_ht.removed_count
+
+
+    # Returns the number of items in the HashTable
+    def __len__(self):
+        return self.count
 
 
     # Overloaded print function
@@ -88,29 +88,30 @@ class DeliveryManager:
         return "Package not found."
 
 
-# Example usage
-
-# Creating Package #9 with incorrect address (will be corrected at 10:20 AM)
-package9 = Package(
-    id_number=9,
-    delivery_address="Third District Juvenile Court",  # Wrong address
-    delivery_city="Salt Lake City",
-    delivery_state="UT",
-    delivery_zip="84101",
-    delivery_deadline="10:00",
-    package_mass=5,
-    special_notes="Wrong address listed. Will be corrected at 10:20 AM.",
-    delivery_status="Pending"
-)
-
-# Creating Delivery Manager and adding the package
-manager = DeliveryManager()
-manager.add_package(package9)
-
-# Testing delivery at different times
-current_time = timedelta(hours=9, minutes=30)  # Before address correction
-print(manager.handle_package_delivery(9, current_time))  # Expect a delayed message due to wrong address
-
-current_time = timedelta(hours=10, minutes=30)  # After address correction
-print(manager.handle_package_delivery(9, current_time))  # Should say "Package 9 has been delivered."
-
+# The example below only runs when this file is executed directly, so importing the module has no side effects
+if __name__ == "__main__":
+    # Example usage
+
+    # Creating Package #9 with incorrect address (will be corrected at 10:20 AM)
+    package9 = Package(
+        id_number=9,
+        delivery_address="Third District Juvenile Court",  # Wrong address
+        delivery_city="Salt Lake City",
+        delivery_state="UT",
+        delivery_zip="84101",
+        delivery_deadline="10:00",
+        package_mass=5,
+        special_notes="Wrong address listed. Will be corrected at 10:20 AM.",
+        delivery_status="Pending"
+    )
+
+    # Creating Delivery Manager and adding the package
+    manager = DeliveryManager()
+    manager.add_package(package9)
+
+    # Testing delivery at different times
+    current_time = timedelta(hours=9, minutes=30)  # Before address correction
+    print(manager.handle_package_delivery(9, current_time))  # Expect a delayed message due to wrong address
+
+    current_time = timedelta(hours=10, minutes=30)  # After address correction
+    print(manager.handle_package_delivery(9, current_time))  # Should say "Package 9 has been delivered."
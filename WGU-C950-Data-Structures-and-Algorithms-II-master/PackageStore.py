@@ -0,0 +1,97 @@
+import threading
+from collections import namedtuple
+from types import MappingProxyType
+
+# Immutable copies of a Package and a Truck. They expose the same attribute names as the Package and Truck objects
+# so the status functions in main work with either one
+PackageRecord = namedtuple("PackageRecord", [
+    "id_number", "delivery_address", "delivery_city", "delivery_state", "delivery_zip", "delivery_deadline",
+    "package_mass", "special_notes", "delivery_status", "assigned_truck_id", "en_route_timestamp",
+    "delivery_timestamp"])
+
+TruckRecord = namedtuple("TruckRecord", ["id", "mileage_timestamps"])
+
+
+# Space-Time Complexity: O(1)
+# Returns an immutable copy of the Package
+def freeze_package(package):
+    return PackageRecord(package.id_number, package.delivery_address, package.delivery_city, package.delivery_state,
+                         package.delivery_zip, package.delivery_deadline, package.package_mass,
+                         package.special_notes, package.delivery_status, package.assigned_truck_id,
+                         package.en_route_timestamp, package.delivery_timestamp)
+
+
+# Space-Time Complexity: O(N) where N is the number of mileage timestamps
+# Returns an immutable copy of the Truck
+def freeze_truck(truck):
+    return TruckRecord(truck.id, tuple(tuple(timestamp) for timestamp in truck.mileage_timestamps))
+
+
+class StoreView:
+    # A consistent, point-in-time view of every Package and Truck. A view is never modified after it is published,
+    # so any number of threads can read it without a lock
+    def __init__(self, version, packages, truck_list, attachments):
+        self.version = version
+        self.packages = MappingProxyType(packages)
+        self.truck_list = tuple(truck_list)
+        self.attachments = MappingProxyType(attachments)
+
+    # Returns the Package record with the matching ID, or None if not found
+    def lookup(self, key):
+        return self.packages.get(key)
+
+    # Returns the number of Packages in the view
+    def __len__(self):
+        return len(self.packages)
+
+
+class PackageStore:
+    # Package store with a single writer and lock-free readers. Readers take the current view, which is a single
+    # reference read, and keep using it for as long as they need a consistent view. The writer builds a new view on
+    # the side (copy-on-write) and replaces the reference once the view is complete, so readers never see a
+    # partially applied update
+    def __init__(self):
+        self.write_lock = threading.Lock()
+        self.current_view = StoreView(0, {}, [], {})
+
+    # Space-Time Complexity: O(1)
+    # Returns the current view. Never blocks, even while the writer is publishing
+    def get_view(self):
+        return self.current_view
+
+    # Space-Time Complexity: O(1)
+    # Returns the Package record with the matching ID from the current view, or None if not found
+    def lookup(self, key):
+        return self.current_view.lookup(key)
+
+    # Space-Time Complexity: O(N)
+    # Publishes a new view built from every Package in the HashTable and every Truck. Attachments are extra
+    # read-only values that belong with this version of the plan, e.g. a DeadlineRiskTracker
+    def publish(self, ht, truck_list, attachments=None):
+        packages = {package.id_number: freeze_package(package) for package in ht.package_table if package is not None}
+        trucks = [freeze_truck(truck) for truck in truck_list]
+
+        with self.write_lock:
+            self.current_view = StoreView(self.current_view.version + 1, packages, trucks, attachments or {})
+            return self.current_view
+
+    # Space-Time Complexity: O(N) to copy the index, O(C) to freeze the C changed Packages
+    # Publishes a new view in which only the changed Packages (and Trucks, if provided) are replaced. Every other
+    # record is shared with the previous view
+    def publish_changes(self, changed_packages, changed_trucks=(), attachments=None):
+        with self.write_lock:
+            previous_view = self.current_view
+
+            packages = dict(previous_view.packages)
+            for package in changed_packages:
+                packages[package.id_number] = freeze_package(package)
+
+            changed_truck_records = {truck.id: freeze_truck(truck) for truck in changed_trucks}
+            trucks = [changed_truck_records.pop(truck.id, truck) for truck in previous_view.truck_list]
+            trucks.extend(changed_truck_records.values())
+
+            if attachments is None:
+                attachments = dict(previous_view.attachments)
+
+            self.current_view = StoreView(previous_view.version + 1, packages, trucks, attachments)
+            return self.current_view
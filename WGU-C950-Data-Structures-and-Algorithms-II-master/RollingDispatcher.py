@@ -0,0 +1,481 @@
+import csv
+import time
+from datetime import datetime, timedelta
+
+from HashTable import HashTable
+from Package import Package
+from route_plan import simulate_truck, start_of_day
+from TravelTimeModel import TravelTimeModel
+
+# Seconds of compute time that planning a single trip may take
+default_compute_budget = 0.05
+
+# Number of backlog Packages scanned between two checks of the compute budget while selecting the units of a trip
+selection_check_interval = 256
+
+# Share of the compute budget spent scanning the backlog for the units of a trip. Choosing the trip among the units
+# found takes a little longer than finding them, and the rest of the budget is left for ordering the trip
+selection_budget_share = 0.25
+
+# Rough number of steps per second of the exact tour solver, used to decide whether the shortest tour over the stops
+# of a trip can be found within the compute budget
+exact_steps_per_second = 2000000
+
+
+# Space-Time Complexity: O(N) to read the file, O(1) memory per arrival
+# Yields (arrival time, Package) pairs read one line at a time from a CSV file. Each line holds the arrival time
+# [HOUR:MINUTE] followed by the columns of the 'packages.csv' file. A malformed line is skipped and described in the
+# list of rejected arrivals when one is provided, otherwise a ValueError is raised
+def iter_arrival_file(path, rejected_arrivals=None):
+    with open(path) as csv_file:
+        for line_number, row in enumerate(csv.reader(csv_file, delimiter=','), 1):
+            if len(row) == 0:
+                continue
+
+            try:
+                if len(row) < 9:
+                    raise ValueError("expected the arrival time followed by 8 package columns, got %d columns"
+                                     % len(row))
+                try:
+                    timestamp = datetime.strptime(row[0], "%H:%M")
+                except ValueError:
+                    raise ValueError("invalid arrival time '%s', expected HH:MM" % row[0])
+                try:
+                    package_id = int(row[1])
+                except ValueError:
+                    raise ValueError("invalid package ID '%s'" % row[1])
+            except ValueError as error:
+                message = "Line %d of %s is rejected, %s" % (line_number, path, error)
+                if rejected_arrivals is None:
+                    raise ValueError(message)
+                rejected_arrivals.append(message)
+                continue
+
+            package = Package(package_id, row[2], row[3], row[4], row[5], row[6], row[7], row[8], "At the hub")
+            yield timedelta(hours=timestamp.hour, minutes=timestamp.minute), package
+
+
+# Space-Time Complexity: O(N)
+# Returns the IDs of the Packages that the Package must be delivered with, parsed from its special notes
+def get_delivered_with_ids(package):
+    if "Must be delivered with" not in package.special_notes:
+        return []
+    return [int(i) for i in package.special_notes.replace(",", " ").split() if i.isdigit()]
+
+
+class RollingDispatcher:
+    # Dispatches the Trucks over a time-ordered stream of (arrival time, Package) pairs. Only the Packages that have
+    # arrived at the hub and are not delivered yet (the backlog) are kept in the HashTable. Each time a Truck is back
+    # at the hub, the next trip is planned over the backlog at that time within the compute budget. Delivered
+    # Packages are archived out of the HashTable into the event log and only their IDs are kept, so memory mostly
+    # depends on the size of the backlog rather than on the number of Packages delivered
+    def __init__(self, arrivals, truck_list, input_data, compute_budget=default_compute_budget, travel_model=None,
+                 event_log=None):
+        self.arrivals = iter(arrivals)
+        self.next_arrival = next(self.arrivals, None)
+        self.last_arrival_time = None
+
+        self.truck_list = truck_list
+        self.address_index = input_data["address_index"]
+        self.distances = input_data["distances"]
+        self.hub_index = self.address_index[truck_list[0].hub_address]
+        self.compute_budget = compute_budget
+        self.travel_model = travel_model if travel_model is not None else TravelTimeModel()
+        self.event_log = event_log
+
+        self.backlog = HashTable()
+
+        # Special notes and address of every Package in the backlog, parsed once when the Package arrives, in arrival
+        # order: {package_id: {"package", "address_index", "available", "deadline", "required_truck"}}
+        self.packages = {}
+
+        self.truck_times = {truck.id: start_of_day for truck in truck_list}
+        self.truck_mileage = {truck.id: 0.0 for truck in truck_list}
+        self.finished_truck_ids = set()
+
+        # Packages that must be delivered together share the same set of IDs. Only Packages that are not delivered
+        # yet are kept
+        self.groups = {}
+
+        # IDs of the Packages that were delivered or rejected. A group never waits for one of these Packages
+        self.closed_package_ids = set()
+
+        # Descriptions of the arrivals that were rejected instead of being added to the backlog
+        self.rejected_arrivals = []
+
+        self.trip_count = 0
+        self.delivered_count = 0
+        self.late_count = 0
+        self.total_lateness = timedelta(0)
+        self.max_backlog = 0
+
+    # Space-Time Complexity: O(A) where A is the number of Packages arriving
+    # Moves every Package that has arrived by the current time from the stream into the backlog. A Package that
+    # arrives before the previous arrival is rejected, since the stream must be in time order. A Package with the
+    # same ID as a Package in the backlog is rejected, so that the Package already waiting is not replaced, and so is
+    # a Package whose delivery address is not in the distance table, since no trip could be timed to it
+    def receive_arrivals(self, current_time):
+        while self.next_arrival is not None and self.next_arrival[0] <= current_time:
+            arrival_time, package = self.next_arrival
+            self.next_arrival = next(self.arrivals, None)
+
+            if self.last_arrival_time is not None and arrival_time < self.last_arrival_time:
+                self.rejected_arrivals.append("Package %d arriving at %s is rejected, it is listed after an arrival "
+                                              "at %s" % (package.id_number, arrival_time, self.last_arrival_time))
+                self.close_rejected_package(package.id_number)
+                continue
+            self.last_arrival_time = arrival_time
+
+            if self.backlog.lookup(package.id_number) is not None:
+                self.rejected_arrivals.append("Package %d arriving at %s is rejected, a package with the same ID is "
+                                              "not delivered yet" % (package.id_number, arrival_time))
+                continue
+            if package.delivery_address not in self.address_index:
+                self.rejected_arrivals.append("Package %d arriving at %s is rejected, its address '%s' is not in the "
+                                              "distance table" % (package.id_number, arrival_time,
+                                                                  package.delivery_address))
+                self.close_rejected_package(package.id_number)
+                continue
+
+            self.backlog.insert(package)
+            self.closed_package_ids.discard(package.id_number)
+            self.packages[package.id_number] = {
+                "package": package,
+                "address_index": self.address_index[package.delivery_address],
+                "available": arrival_time,
+                "deadline": package.get_delivery_deadline_timedelta(),
+                "required_truck": package.get_required_truck_id()
+            }
+            self.add_to_group(package)
+
+        self.max_backlog = max(self.max_backlog, len(self.backlog))
+
+    # Space-Time Complexity: O(1)
+    # Records that the Package was delivered or rejected and removes it from its group, so that the rest of the group
+    # no longer waits for it
+    def close_package(self, package_id):
+        self.closed_package_ids.add(package_id)
+        group = self.groups.pop(package_id, None)
+        if group is not None:
+            group.discard(package_id)
+
+    # Space-Time Complexity: O(1)
+    # Closes a rejected Package unless another Package with the same ID is waiting in the backlog
+    def close_rejected_package(self, package_id):
+        if self.backlog.lookup(package_id) is None:
+            self.close_package(package_id)
+
+    # Space-Time Complexity: O(G) where G is the size of the group
+    # Merges the Package and the Packages listed in its special notes into a single group. Packages that were
+    # already delivered or rejected are left out
+    def add_to_group(self, package):
+        delivered_with_ids = [package_id for package_id in get_delivered_with_ids(package)
+                              if package_id not in self.closed_package_ids]
+        if len(delivered_with_ids) == 0:
+            return
+
+        group = {package.id_number}
+        for package_id in [package.id_number] + delivered_with_ids:
+            group.add(package_id)
+            group.update(self.groups.get(package_id, ()))
+        for package_id in group:
+            self.groups[package_id] = group
+
+    # Space-Time Complexity: O(G) where G is the size of the group
+    # Returns the Packages that must leave the hub together with the Package, or None if a Package of the group has
+    # not arrived yet. Once the stream is exhausted, the Packages of the group that did arrive leave together
+    def get_unit(self, package):
+        group = self.groups.get(package.id_number)
+        if group is None:
+            return [package]
+
+        unit = []
+        for package_id in sorted(group):
+            group_package = self.backlog.lookup(package_id)
+            if group_package is None:
+                if self.next_arrival is not None:
+                    return None
+            else:
+                unit.append(group_package)
+        return unit
+
+    # Space-Time Complexity: O(N) where N is the size of the backlog, bounded by the compute budget
+    # Returns the units of Packages in the backlog that the Truck can deliver. A unit is a single Package or a group
+    # of Packages that must be delivered together. The backlog is scanned in arrival order, and once the selection
+    # deadline has passed the scan stops as soon as the units found can fill the Truck, so the oldest Packages are
+    # considered first when the backlog is too large to scan within the compute budget
+    def get_units(self, truck, selection_deadline):
+        packages = self.packages
+        units = []
+        seen_ids = set()
+
+        for package_count, package_data in enumerate(packages.values()):
+            if package_count % selection_check_interval == 0 and len(units) >= truck.capacity:
+                if time.perf_counter() >= selection_deadline:
+                    break
+
+            package = package_data["package"]
+            if package.id_number in seen_ids:
+                continue
+
+            # Most Packages are not part of a group and form a unit on their own
+            if package.id_number not in self.groups:
+                required_truck = package_data["required_truck"]
+                if required_truck is None or required_truck == truck.id:
+                    units.append([package])
+                continue
+
+            unit = self.get_unit(package)
+            if unit is None:
+                continue
+            seen_ids.update(unit_package.id_number for unit_package in unit)
+
+            required_trucks = set(packages[unit_package.id_number]["required_truck"] for unit_package in unit)
+            required_trucks.discard(None)
+            if len(required_trucks) > 0 and required_trucks != {truck.id}:
+                continue
+            if len(unit) <= truck.capacity:
+                units.append(unit)
+
+        return units
+
+    # Space-Time Complexity: O(U + P * A log A) where U is the number of units, P the number of Packages on the trip
+    # and A the number of addresses
+    # Selects the units of the next trip. The trip starts with the unit that has the earliest deadline (or the unit
+    # nearest to the hub if no unit has a deadline), then repeatedly adds the unit nearest to the previous stop that
+    # still fits on the Truck. Units are bucketed by the addresses they are delivered to, so finding the nearest unit
+    # only compares the addresses rather than every unit of the backlog
+    def select_trip(self, truck, units):
+        packages = self.packages
+        distances = self.distances
+        no_deadline = timedelta(days=1)
+
+        def earliest_deadline(unit):
+            deadlines = [packages[package.id_number]["deadline"] for package in unit]
+            deadlines = [deadline for deadline in deadlines if deadline is not None]
+            return min(deadlines) if len(deadlines) > 0 else no_deadline
+
+        def distance_from(address_index, unit):
+            return min(distances[address_index][packages[package.id_number]["address_index"]] for package in unit)
+
+        # Find the first unit and bucket the units by address in a single pass. Most units are a single Package,
+        # whose deadline and address are read directly
+        hub_distances = distances[self.hub_index]
+        first_unit = None
+        first_key = None
+
+        # Units waiting at every address, in backlog order. A unit delivered to several addresses is in every bucket
+        address_units = {}
+        for unit in units:
+            if len(unit) == 1:
+                package_data = packages[unit[0].id_number]
+                deadline = package_data["deadline"]
+                unit_key = (deadline if deadline is not None else no_deadline,
+                            hub_distances[package_data["address_index"]])
+                address_units.setdefault(package_data["address_index"], []).append(unit)
+            else:
+                unit_key = (earliest_deadline(unit), distance_from(self.hub_index, unit))
+                for address_index in set(packages[package.id_number]["address_index"] for package in unit):
+                    address_units.setdefault(address_index, []).append(unit)
+
+            if first_key is None or unit_key < first_key:
+                first_unit = unit
+                first_key = unit_key
+
+        trip = list(first_unit)
+        selected_units = {id(first_unit)}
+
+        while len(trip) < truck.capacity:
+            current_index = packages[trip[len(trip) - 1].id_number]["address_index"]
+            nearest_unit = None
+
+            current_distances = distances[current_index]
+            for address_index in sorted(address_units, key=lambda address_index: current_distances[address_index]):
+                for unit in address_units[address_index]:
+                    if id(unit) not in selected_units and len(trip) + len(unit) <= truck.capacity:
+                        nearest_unit = unit
+                        break
+                if nearest_unit is not None:
+                    break
+            if nearest_unit is None:
+                break
+
+            selected_units.add(id(nearest_unit))
+            trip.extend(nearest_unit)
+
+        return trip
+
+    # Space-Time Complexity: O(1)
+    # Returns the routing problem of a trip of the Truck departing at the provided time (see route_plan), so that trips
+    # are timed by the same simulation as the planned day. The Packages of the problem are the Packages of the backlog
+    def get_trip_problem(self, truck, departure_time):
+        return {
+            "distances": self.distances,
+            "hub_index": self.hub_index,
+            "packages": self.packages,
+            "trucks": {truck.id: {"start_time": departure_time, "capacity": truck.capacity}},
+            "groups": [],
+            "travel_model": self.travel_model
+        }
+
+    # Space-Time Complexity: O(S^2) per improvement round within the compute budget, O(2^S * S^2) for the exact tour
+    # Orders the stops of the trip. The nearest neighbour order is improved by reversing segments (2-opt) until no
+    # reversal shortens the trip or the compute budget is used up. When the exact tour fits in the remaining budget
+    # it is tried in both directions as well. The order with the fewest late Packages, then the least lateness,
+    # then the shortest distance is kept
+    def order_trip(self, truck, departure_time, trip, planning_deadline):
+        stop_packages = {}
+        for package in trip:
+            stop_packages.setdefault(self.packages[package.id_number]["address_index"], []).append(package)
+
+        # Nearest neighbour order starting from the hub
+        remaining = set(stop_packages)
+        stops = []
+        current_index = self.hub_index
+        while len(remaining) > 0:
+            current_index = min(remaining, key=lambda stop_index: self.distances[current_index][stop_index])
+            remaining.remove(current_index)
+            stops.append(current_index)
+
+        # 2-opt improvement within the compute budget
+        route = [self.hub_index] + stops + [self.hub_index]
+        improved = True
+        while improved and time.perf_counter() < planning_deadline:
+            improved = False
+            for i in range(1, len(route) - 2):
+                for j in range(i + 1, len(route) - 1):
+                    change = (self.distances[route[i - 1]][route[j]] + self.distances[route[i]][route[j + 1]] -
+                              self.distances[route[i - 1]][route[i]] - self.distances[route[j]][route[j + 1]])
+                    if change < -1e-9:
+                        route[i:j + 1] = route[i:j + 1][::-1]
+                        improved = True
+        candidate_orders = [route[1:-1]]
+
+        problem = self.get_trip_problem(truck, departure_time)
+        num_stops = len(stops)
+        remaining_budget = planning_deadline - time.perf_counter()
+        if num_stops > 1 and (1 << num_stops) * num_stops * num_stops <= exact_steps_per_second * remaining_budget:
+            from exact_solver import solve_exact_tour
+
+            exact_order, exact_distance = solve_exact_tour(problem, stops)
+            candidate_orders.extend([exact_order, exact_order[::-1]])
+
+        def simulate_order(order):
+            simulation = simulate_truck(problem, truck.id, [[package.id_number for stop_index in order
+                                                              for package in stop_packages[stop_index]]])
+            return simulation["late_packages"], simulation["total_lateness"], simulation["mileage"]
+
+        best_order = min(candidate_orders, key=simulate_order)
+        return [package for stop_index in best_order for package in stop_packages[stop_index]]
+
+    # Space-Time Complexity: O(P) where P is the number of Packages on the trip
+    # Drives the trip, records every event in the event log and archives the delivered Packages out of the backlog.
+    # Returns a summary of the trip
+    def run_trip(self, truck, departure_time, trip):
+        truck_id = truck.id
+        start_mileage = self.truck_mileage[truck_id]
+        simulation = simulate_truck(self.get_trip_problem(truck, departure_time), truck_id,
+                                    [[package.id_number for package in trip]])
+
+        # The timeline holds the departure, one entry per delivery and the return to the hub
+        timeline = simulation["timeline"]
+
+        if self.event_log is not None:
+            from event_log import event_depart, event_load
+
+            for package in trip:
+                self.event_log.write_event(event_load, truck_id, package.id_number, departure_time, start_mileage)
+                self.event_log.write_event(event_depart, truck_id, package.id_number, departure_time, start_mileage)
+
+        for timeline_index, package in enumerate(trip, 1):
+            package.assigned_truck_id = truck_id
+            package.delivery_status = "Delivered"
+            package.en_route_timestamp = departure_time
+            package.delivery_timestamp = simulation["delivery_times"][package.id_number]
+            self.archive_package(truck_id, package, start_mileage + timeline[timeline_index][0])
+
+        trip_mileage, return_time = timeline[len(timeline) - 1]
+        mileage = start_mileage + trip_mileage
+
+        if self.event_log is not None:
+            from event_log import event_return
+            self.event_log.write_event(event_return, truck_id, 0, return_time, mileage)
+
+        self.truck_times[truck_id] = return_time
+        self.truck_mileage[truck_id] = mileage
+        self.trip_count += 1
+
+        return {
+            "truck_id": truck_id,
+            "departure_time": departure_time,
+            "return_time": return_time,
+            "package_ids": [package.id_number for package in trip],
+            "mileage": trip_mileage
+        }
+
+    # Space-Time Complexity: O(1) amortized
+    # Records the delivery of the Package in the event log and the summary metrics, then removes the Package from
+    # the backlog and from its group
+    def archive_package(self, truck_id, package, mileage):
+        if self.event_log is not None:
+            from event_log import event_deliver
+            self.event_log.write_event(event_deliver, truck_id, package.id_number, package.delivery_timestamp,
+                                       mileage)
+
+        deadline = self.packages[package.id_number]["deadline"]
+        if deadline is not None and package.delivery_timestamp > deadline:
+            self.late_count += 1
+            self.total_lateness += package.delivery_timestamp - deadline
+        self.delivered_count += 1
+
+        self.backlog.remove(package.id_number)
+        self.packages.pop(package.id_number, None)
+        self.close_package(package.id_number)
+
+    # Plans and drives the next trip of the Truck that is back at the hub first. A Truck with nothing to deliver
+    # waits at the hub for the next arrival, and is done for the day once the stream is exhausted. Returns a summary
+    # of the trip, or None once every Truck is done
+    def dispatch_next_trip(self):
+        while len(self.finished_truck_ids) < len(self.truck_list):
+            truck = min((truck for truck in self.truck_list if truck.id not in self.finished_truck_ids),
+                        key=lambda truck: (self.truck_times[truck.id], truck.id))
+            current_time = self.truck_times[truck.id]
+            self.receive_arrivals(current_time)
+
+            # The compute budget covers the whole planning of the trip, from selecting its units to ordering them
+            planning_start = time.perf_counter()
+            planning_deadline = planning_start + self.compute_budget
+            units = self.get_units(truck, planning_start + self.compute_budget * selection_budget_share)
+            if len(units) == 0:
+                if self.next_arrival is None:
+                    self.finished_truck_ids.add(truck.id)
+                else:
+                    self.truck_times[truck.id] = max(current_time, self.next_arrival[0])
+                continue
+
+            trip = self.order_trip(truck, current_time, self.select_trip(truck, units), planning_deadline)
+            return self.run_trip(truck, current_time, trip)
+
+        return None
+
+    # Yields the summary of every trip until the stream is exhausted and the backlog is delivered
+    def run(self):
+        trip = self.dispatch_next_trip()
+        while trip is not None:
+            yield trip
+            trip = self.dispatch_next_trip()
+
+    # Space-Time Complexity: O(1)
+    # Returns the summary metrics of the day so far
+    def get_summary(self):
+        return {
+            "trips": self.trip_count,
+            "delivered": self.delivered_count,
+            "late_count": self.late_count,
+            "total_lateness": self.total_lateness,
+            "total_mileage": sum(self.truck_mileage.values()),
+            "backlog": len(self.backlog),
+            "rejected": len(self.rejected_arrivals),
+            "max_backlog": self.max_backlog,
+            "backlog_buckets": len(self.backlog.package_table)
+        }
@@ -0,0 +1,71 @@
+from datetime import timedelta
+
+# Average speed of a Truck in miles per hour
+average_truck_speed = 18
+
+# Number of minutes in a day, the resolution of the time-of-day speed profile
+minutes_per_day = 24 * 60
+
+
+class TravelTimeModel:
+    # Travel-time provider used by the simulation. Each Truck has its own speed, each stop adds a service time, and
+    # a time-of-day profile scales the speed (e.g. 0.8 during rush hour). The profile is a list of
+    # (start time, speed factor) pairs; each factor applies from its start time until the next start time. Speeds and
+    # speed factors must be positive and the service time must not be negative, otherwise a ValueError is raised
+    def __init__(self, default_speed=average_truck_speed, truck_speeds=None, service_time=timedelta(0),
+                 speed_profile=None):
+        if default_speed <= 0:
+            raise ValueError("The default speed must be positive, got %s" % default_speed)
+        for truck_id, truck_speed in (truck_speeds or {}).items():
+            if truck_speed <= 0:
+                raise ValueError("The speed of truck %s must be positive, got %s" % (truck_id, truck_speed))
+        for start_time, speed_factor in speed_profile or []:
+            if speed_factor <= 0:
+                raise ValueError("The speed factor from %s must be positive, got %s" % (start_time, speed_factor))
+        if service_time < timedelta(0):
+            raise ValueError("The service time must not be negative, got %s" % service_time)
+
+        self.default_speed = default_speed
+        self.truck_speeds = dict(truck_speeds or {})
+        self.service_time = service_time
+        self.speed_profile = sorted(speed_profile or [])
+
+        # Precompute the speed factor of every minute of the day so that a lookup is a single list index
+        self.minute_speed_factors = [1.0] * minutes_per_day
+        for profile_index, (start_time, speed_factor) in enumerate(self.speed_profile):
+            if profile_index + 1 < len(self.speed_profile):
+                end_time = self.speed_profile[profile_index + 1][0]
+            else:
+                end_time = timedelta(days=1)
+
+            start_minute = int(start_time.total_seconds()) // 60
+            end_minute = min(int(end_time.total_seconds()) // 60, minutes_per_day)
+            for minute in range(start_minute, end_minute):
+                self.minute_speed_factors[minute] = speed_factor
+
+        # Speed of every configured Truck at every minute of the day, computed on first use
+        self.truck_minute_speeds = {}
+
+    # Space-Time Complexity: O(1) after the first lookup for the Truck
+    # Returns the speed of the Truck in miles per hour when departing at the specified time
+    def get_speed(self, truck_id, departure_time):
+        minute_speeds = self.truck_minute_speeds.get(truck_id)
+        if minute_speeds is None:
+            truck_speed = self.truck_speeds.get(truck_id, self.default_speed)
+            minute_speeds = [truck_speed * speed_factor for speed_factor in self.minute_speed_factors]
+            self.truck_minute_speeds[truck_id] = minute_speeds
+
+        return minute_speeds[(int(departure_time.total_seconds()) // 60) % minutes_per_day]
+
+    # Space-Time Complexity: O(1)
+    # Returns the time the Truck needs to drive the distance when departing at the specified time. The speed at the
+    # time of departure is used for the whole leg
+    def travel_time(self, truck_id, departure_time, distance):
+        if distance == 0:
+            return timedelta(0)
+        return timedelta(hours=distance / self.get_speed(truck_id, departure_time))
+
+    # Space-Time Complexity: O(1)
+    # Returns the time spent at a stop to hand over the Packages before the Truck leaves again
+    def get_service_time(self, truck_id):
+        return self.service_time
@@ -1,133 +1,79 @@
-from datetime import datetime, timedelta
+from datetime import timedelta
 
-class Package:
-    def __init__(self, id_number, delivery_address, delivery_city, delivery_state, delivery_zip, delivery_deadline,
-                 package_mass, special_notes, delivery_status):
-        self.id_number = id_number
-        self.delivery_address = delivery_address
-        self.delivery_city = delivery_city
-        self.delivery_state = delivery_state
-        self.delivery_zip = delivery_zip
-        self.delivery_deadline = delivery_deadline
-        self.package_mass = package_mass
-        self.special_notes = special_notes
-        self.delivery_status = delivery_status
-        self.assigned_truck_id = None
-        self.on_truck = False
-        self.en_route_timestamp = None
-        self.delivery_timestamp = None
-
-    def is_truck_assigned(self):
-        return self.assigned_truck_id is not None
-
-    def get_required_truck_id(self):
-        if "Can only be on truck" in self.special_notes:
-            specified_truck_id = [int(i) for i in self.special_notes.split() if i.isdigit()]
-            if specified_truck_id:
-                return specified_truck_id[0]
-        return None
-
-    def get_delayed_arrival_time(self):
-        if "Delayed on flight---will not arrive to depot until" in self.special_notes:
-            tokenized_special_notes = self.special_notes.split()
-            for token in tokenized_special_notes:
-                try:
-                    timestamp = datetime.strptime(token, "%H:%M")
-                    delayed_arrival_timedelta = timedelta(hours=timestamp.hour, minutes=timestamp.minute)
-                    return delayed_arrival_timedelta
-                except:
-                    pass
-        if "Wrong address listed" in self.special_notes:
-            delayed_arrival_timedelta = timedelta(hours=10, minutes=20)
-            return delayed_arrival_timedelta
-        return None
-
-    def get_delivery_deadline_timedelta(self):
-        tokenized_special_notes = self.delivery_deadline.split()
-        for token in tokenized_special_notes:
-            try:
-                timestamp = datetime.strptime(token, "%H:%M")
-                delivery_deadline_timedelta = timedelta(hours=timestamp.hour, minutes=timestamp.minute)
-                return delivery_deadline_timedelta
-            except:
-                pass
+from TravelTimeModel import TravelTimeModel
 
 
 class Truck:
-    def __init__(self, truck_id, driver_name, capacity):
-        self.truck_id = truck_id
-        self.driver_name = driver_name
+    # Initializes the Truck object with an ID, the number of Packages it can hold, its average speed in miles per hour
+    # and the address of the hub it is loaded at. Every Truck starts the day at the hub at 8:00 AM. Driving is timed
+    # with the TravelTimeModel when one is provided, the same model that times the plan in route_plan; otherwise a
+    # model with the Truck's constant speed is used
+    def __init__(self, truck_id, capacity=16, speed=18, hub_address="4001 South 700 East", travel_model=None):
+        self.id = truck_id
+        self.driver = None
         self.capacity = capacity
-        self.packages = []  # List to hold packages assigned to this truck
-
+        self.speed = speed
+        self.travel_model = travel_model if travel_model is not None else TravelTimeModel(default_speed=speed)
+        self.hub_address = hub_address
+        self.packages_id_list = []  # IDs of the Packages loaded on this Truck, in delivery order
+        self.at_hub = True
+        self.at_stop = False  # True while the Truck is at a delivery address
+        self.time_obj = timedelta(hours=8)
+        self.mileage = 0.0
+
+        # Mileage and time of the day after every delivery and every return to the hub
+        self.mileage_timestamps = [[0.0, timedelta(hours=8)]]
+
+    # Space-Time Complexity: O(1)
+    # Returns True if no more Packages can be loaded on this Truck
+    def is_full(self):
+        return len(self.packages_id_list) >= self.capacity
+
+    # Space-Time Complexity: O(1)
+    # Loads the Package on this Truck
     def assign_package(self, package):
-        if len(self.packages) < self.capacity:
-            self.packages.append(package)
-            package.assigned_truck_id = self.truck_id
-            package.on_truck = True
-        else:
-            print(f"Truck {self.truck_id} is full, cannot assign more packages.")
-
-
-class DeliveryManager:
-    def __init__(self):
-        self.packages = {}  # Dictionary to store packages by their ID
-
-    def add_package(self, package):
-        self.packages[package.id_number] = package
-
-    def get_package(self, package_id):
-        return self.packages.get(package_id)
-
-    def handle_package_delivery(self, package_id, current_time):
-        package = self.get_package(package_id)
-        if package:
-            delayed_arrival_time = package.get_delayed_arrival_time()
-            if delayed_arrival_time:
-                if current_time < delayed_arrival_time:
-                    return f"Package {package_id} will be delivered after {delayed_arrival_time} due to address correction."
-                else:
-                    return f"Package {package_id} has been delivered."
-            else:
-                return f"Package {package_id} has been delivered on time."
-        return "Package not found."
-
-    def display_package_at_time(self, current_time):
-        for package_id, package in self.packages.items():
-            delivery_status = self.handle_package_delivery(package_id, current_time)
-            truck_info = f"Truck ID: {package.assigned_truck_id}" if package.assigned_truck_id else "No truck assigned"
-            print(f"Package ID: {package_id} | {delivery_status} | {truck_info}")
-
-
-# Example of Bulk Package Creation
-manager = DeliveryManager()
-
-# Create 10 packages with various special conditions
-for i in range(1, 11):
-    special_notes = ""
-    if i % 3 == 0:
-        special_notes = "Wrong address listed. Will be corrected at 10:20 AM."
-    elif i % 5 == 0:
-        special_notes = "Delayed on flight---will not arrive to depot until 12:00."
-    
-    package = Package(
-        id_number=i,
-        delivery_address=f"Address {i}",
-        delivery_city="Salt Lake City",
-        delivery_state="UT",
-        delivery_zip="84101",
-        delivery_deadline="10:00",
-        package_mass=5,
-        special_notes=special_notes,
-        delivery_status="Pending"
-    )
-
-    manager.add_package(package)
-
-# Simulate user input for current time
-user_time_input = input("Enter the current time in HH:MM format: ")
-current_time = datetime.strptime(user_time_input, "%H:%M").time()
-current_time = timedelta(hours=current_time.hour, minutes=current_time.minute)
-
-# Display package details at the entered time
-manager.display_package_at_time(current_time)
+        self.packages_id_list.append(package.id_number)
+        package.assigned_truck_id = self.id
+
+    # Space-Time Complexity: O(N)
+    # Returns the Packages loaded on this Truck
+    def get_package_list(self, ht):
+        return [ht.lookup(package_id) for package_id in self.packages_id_list]
+
+    # Space-Time Complexity: O(N)
+    # Marks every Package loaded on this Truck as en route and sends the Truck out of the hub
+    def set_packages_en_route(self, ht):
+        for package_id in self.packages_id_list:
+            package = ht.lookup(package_id)
+            package.delivery_status = "En route"
+            package.en_route_timestamp = self.time_obj
+        self.at_hub = False
+
+    # Space-Time Complexity: O(N)
+    # Drives the provided distance to the address of the Package, delivers it and unloads it from the Truck
+    def deliver_package(self, ht, package_id, distance):
+        self.drive(distance)
+        self.at_stop = True
+
+        package = ht.lookup(package_id)
+        package.delivery_status = "Delivered"
+        package.delivery_timestamp = self.time_obj
+        self.packages_id_list.remove(package_id)
+
+    # Space-Time Complexity: O(1)
+    # Drives the provided distance back to the hub
+    def send_back_to_hub(self, distance):
+        self.drive(distance)
+        self.at_stop = False
+        self.at_hub = True
+
+    # Space-Time Complexity: O(1)
+    # Adds the provided distance to the mileage and moves the time of the day forward by the time spent driving it.
+    # A Truck leaving a delivery address first spends the service time there handing over the Packages
+    def drive(self, distance):
+        if self.at_stop and distance > 0:
+            self.time_obj = self.time_obj + self.travel_model.get_service_time(self.id)
+
+        self.mileage = self.mileage + distance
+        self.time_obj = self.time_obj + self.travel_model.travel_time(self.id, self.time_obj, distance)
+        self.mileage_timestamps.append([self.mileage, self.time_obj])
@@ -0,0 +1,329 @@
+import argparse
+import sys
+import time
+from datetime import datetime, timedelta
+
+from report import default_page_size, sort_keys
+
+# Only the modules needed to parse the command line are imported here. Every command imports what it needs when it
+# runs, so answering a query from the plan snapshot never loads the planning modules
+
+
+# Space-Time Complexity: O(1)
+# Converts a time provided in the format [HOUR:MINUTE] (24-hour clock) to a timedelta
+def parse_time_argument(time_text):
+    try:
+        timestamp = datetime.strptime(time_text, "%H:%M")
+    except ValueError:
+        raise argparse.ArgumentTypeError("invalid time '%s', expected HH:MM" % time_text)
+    return timedelta(hours=timestamp.hour, minutes=timestamp.minute)
+
+
+# Space-Time Complexity: O(1)
+# Returns the planner options of the command line. The plan snapshot is only used for the options it was planned with
+def get_planner_config(arguments):
+    return {"optimize": arguments.optimize, "exact": arguments.exact, "speed": arguments.speed,
+            "service_minutes": arguments.service_minutes}
+
+
+# Applies the planner options of the command line to the planner configuration
+def configure_planner(arguments):
+    import main
+
+    if arguments.optimize is not None:
+        main.optimizer_time_budget = arguments.optimize
+    if arguments.exact:
+        main.use_exact_routing = True
+    if arguments.speed is not None or arguments.service_minutes is not None:
+        from TravelTimeModel import TravelTimeModel, average_truck_speed
+
+        main.travel_time_model = TravelTimeModel(
+            default_speed=arguments.speed if arguments.speed is not None else average_truck_speed,
+            service_time=timedelta(minutes=arguments.service_minutes or 0))
+
+
+# Space-Time Complexity: O(1)
+# Converts a speed in miles per hour to a float, which must be positive
+def parse_speed_argument(speed_text):
+    try:
+        speed = float(speed_text)
+    except ValueError:
+        speed = None
+    if speed is None or speed <= 0:
+        raise argparse.ArgumentTypeError("invalid speed '%s', expected a positive number" % speed_text)
+    return speed
+
+
+# Space-Time Complexity: O(1)
+# Converts a number of minutes to a float, which must not be negative
+def parse_minutes_argument(minutes_text):
+    try:
+        minutes = float(minutes_text)
+    except ValueError:
+        minutes = None
+    if minutes is None or minutes < 0:
+        raise argparse.ArgumentTypeError("invalid number of minutes '%s', expected 0 or more" % minutes_text)
+    return minutes
+
+
+# Space-Time Complexity: O(1)
+# Converts a count such as a page number or a number of repetitions to an int, which must be positive
+def parse_positive_int_argument(count_text):
+    try:
+        count = int(count_text)
+    except ValueError:
+        count = None
+    if count is None or count <= 0:
+        raise argparse.ArgumentTypeError("invalid value '%s', expected a positive integer" % count_text)
+    return count
+
+
+# Returns the HashTable and the Trucks of the plan, from the plan snapshot when it is up to date or else by planning
+# with the planner options of the command line. A new plan is saved to the plan snapshot for the next command
+def load_plan(arguments):
+    from snapshot import load_plan_snapshot, plan_snapshot_path, save_plan_snapshot
+
+    planner_config = get_planner_config(arguments)
+    plan = load_plan_snapshot(plan_snapshot_path, planner_config)
+    if plan is None:
+        from main import build_delivery_plan
+        configure_planner(arguments)
+        plan = build_delivery_plan()
+        save_plan_snapshot(plan_snapshot_path, plan[0], plan[1], planner_config)
+    return plan
+
+
+# Prints the mileage of every Truck and the total mileage at the specified time
+def print_mileage(truck_list, report_timedelta):
+    from main import print_total_mileage_at_time
+
+    print_total_mileage_at_time(truck_list, datetime.min + report_timedelta)
+
+
+# Command 'plan': compiles the input snapshot, plans the day and saves the plan snapshot
+def run_plan(arguments):
+    import main
+    from snapshot import compile_input_snapshot, plan_snapshot_path, save_plan_snapshot
+
+    main.input_data = compile_input_snapshot(main.input_snapshot_path)
+    configure_planner(arguments)
+
+    delivery_ht, truck_list = main.build_delivery_plan()
+    save_plan_snapshot(plan_snapshot_path, delivery_ht, truck_list, get_planner_config(arguments))
+
+    print_mileage(truck_list, timedelta(hours=23, minutes=59))
+
+    # Report the deadlines that the plan still misses
+    late_packages = [package for package in delivery_ht.package_table if package is not None
+                     and package.get_delivery_deadline_timedelta() is not None
+                     and package.delivery_timestamp > package.get_delivery_deadline_timedelta()]
+    if len(late_packages) > 0:
+        print("%d packages are delivered after their deadline: %s" % (
+            len(late_packages), ", ".join(str(package.id_number) for package in late_packages)))
+        return 1
+    return 0
+
+
+# Command 'query': displays the status of a single Package at the specified time
+def run_query(arguments):
+    from report import build_timeline_entry, format_report_row, get_entry_status
+
+    delivery_ht, truck_list = load_plan(arguments)
+    package = delivery_ht.lookup(arguments.package_id)
+    if package is None:
+        print("No package found with the provided ID.")
+        return 1
+
+    entry = build_timeline_entry(package)
+    sys.stdout.write(format_report_row(entry, get_entry_status(entry, arguments.time)))
+    return 0
+
+
+# Command 'report': displays the status of all Packages at the specified time, with optional filters and paging
+def run_report(arguments):
+    from report import build_timeline_index, get_report_page, iter_report_rows, write_report
+
+    delivery_ht, truck_list = load_plan(arguments)
+    report_rows = iter_report_rows(build_timeline_index(delivery_ht), arguments.time, arguments.status,
+                                   arguments.truck, arguments.at_risk, arguments.sort)
+    if arguments.page is not None:
+        report_rows = get_report_page(report_rows, arguments.page, arguments.page_size)
+
+    write_report(arguments.time, report_rows)
+    if arguments.truck is None and arguments.status is None and not arguments.at_risk:
+        print_mileage(truck_list, arguments.time)
+    return 0
+
+
+# Returns the Packages of the manifest as (arrival time, Package) pairs in time order. A delayed Package arrives at
+# its delayed arrival time, and a Package listed with a wrong address arrives once its address is corrected
+def get_manifest_arrivals():
+    import main
+    from HashTable import HashTable
+    from route_plan import start_of_day
+
+    manifest_ht = HashTable()
+    main.load_package_data(manifest_ht)
+
+    arrivals = []
+    for package in manifest_ht.package_table:
+        if package is not None:
+            if package.id_number in main.address_corrections:
+                main.correct_package_address(package)
+            arrival_time = package.get_delayed_arrival_time()
+            arrivals.append((arrival_time if arrival_time is not None else start_of_day, package))
+
+    arrivals.sort(key=lambda arrival: (arrival[0], arrival[1].id_number))
+    return arrivals
+
+
+# Command 'dispatch': dispatches the Trucks over a stream of Package arrivals, planning one trip at a time each time
+# a Truck is back at the hub
+def run_dispatch(arguments):
+    import main
+    from RollingDispatcher import RollingDispatcher, default_compute_budget, iter_arrival_file
+    from TravelTimeModel import TravelTimeModel, average_truck_speed
+
+    # Malformed lines of the arrivals file are rejected while the file is read
+    rejected_lines = []
+    if arguments.arrivals is not None:
+        arrivals = iter_arrival_file(arguments.arrivals, rejected_lines)
+    else:
+        arrivals = get_manifest_arrivals()
+
+    travel_model = TravelTimeModel(
+        default_speed=arguments.speed if arguments.speed is not None else average_truck_speed,
+        service_time=timedelta(minutes=arguments.service_minutes or 0))
+    truck_list, driver_list = main.initialize_trucks_drivers(main.num_trucks, main.num_drivers)
+
+    event_log = None
+    if arguments.event_log is not None:
+        from event_log import EventLogWriter
+        event_log = EventLogWriter(arguments.event_log)
+
+    try:
+        compute_budget = arguments.budget if arguments.budget is not None else default_compute_budget
+        dispatcher = RollingDispatcher(arrivals, truck_list, main.get_input_data(), compute_budget, travel_model,
+                                       event_log)
+        for trip in dispatcher.run():
+            print("Truck %d departs at %s with %2d packages, back at %s after %0.2f miles" % (
+                trip["truck_id"], trip["departure_time"], len(trip["package_ids"]), trip["return_time"],
+                trip["mileage"]))
+    finally:
+        if event_log is not None:
+            event_log.close()
+
+    summary = dispatcher.get_summary()
+    print("\n%d packages delivered on %d trips, %d late (%s total lateness), %0.2f miles" % (
+        summary["delivered"], summary["trips"], summary["late_count"], summary["total_lateness"],
+        summary["total_mileage"]))
+    print("Largest backlog: %d packages in %d buckets" % (summary["max_backlog"], summary["backlog_buckets"]))
+    for rejected_arrival in rejected_lines + dispatcher.rejected_arrivals:
+        print(rejected_arrival)
+    if summary["backlog"] > 0:
+        print("%d packages could not be delivered by any truck" % summary["backlog"])
+    return 1 if summary["backlog"] > 0 or summary["rejected"] > 0 or len(rejected_lines) > 0 else 0
+
+
+# Command 'bench': measures the cost of every startup phase. Snapshots are written to a temporary directory so that
+# the snapshots used by the other commands are left untouched
+def run_bench(arguments):
+    import io
+    import os
+    import tempfile
+
+    import main
+    from report import build_timeline_index, iter_report_rows, write_report
+    from snapshot import (compile_input_snapshot, load_plan_snapshot, parse_input_data, read_snapshot,
+                          save_plan_snapshot)
+
+    def measure(phase_name, function):
+        start = time.perf_counter()
+        for repetition in range(arguments.repeat):
+            result = function()
+        elapsed = (time.perf_counter() - start) / arguments.repeat
+        print("%-28s %10.3f ms" % (phase_name, elapsed * 1000))
+        return result
+
+    with tempfile.TemporaryDirectory() as bench_directory:
+        input_path = os.path.join(bench_directory, "inputs.snapshot")
+        plan_path = os.path.join(bench_directory, "plan.snapshot")
+
+        main.input_data = measure("Parse CSV inputs", parse_input_data)
+        measure("Compile input snapshot", lambda: compile_input_snapshot(input_path))
+        measure("Load input snapshot", lambda: read_snapshot(input_path))
+
+        delivery_ht, truck_list = measure("Plan deliveries", main.build_delivery_plan)
+        measure("Save plan snapshot", lambda: save_plan_snapshot(plan_path, delivery_ht, truck_list))
+        measure("Load plan snapshot", lambda: load_plan_snapshot(plan_path))
+
+    report_time = timedelta(hours=10)
+    measure("Render general report", lambda: write_report(
+        report_time, iter_report_rows(build_timeline_index(delivery_ht), report_time), io.StringIO()))
+    return 0
+
+
+# Space-Time Complexity: O(1)
+# Builds the command line parser with one subcommand per use case
+def build_argument_parser():
+    parser = argparse.ArgumentParser(description="Western Governors University Parcel Service")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    # Planner options shared by every command that reads the plan, which is planned again unless the plan snapshot
+    # was computed with the same options
+    planner_parser = argparse.ArgumentParser(add_help=False)
+    planner_parser.add_argument("--optimize", type=float, metavar="SECONDS", help="optimizer time budget")
+    planner_parser.add_argument("--exact", action="store_true", help="reorder every trip along its shortest tour")
+    planner_parser.add_argument("--speed", type=parse_speed_argument, metavar="MPH",
+                                help="average speed of every truck")
+    planner_parser.add_argument("--service-minutes", type=parse_minutes_argument, metavar="MINUTES",
+                                help="time spent at every stop")
+
+    plan_parser = subparsers.add_parser("plan", parents=[planner_parser],
+                                        help="plan the day and save the plan snapshot")
+    plan_parser.set_defaults(handler=run_plan)
+
+    query_parser = subparsers.add_parser("query", parents=[planner_parser], help="status of a single package")
+    query_parser.add_argument("package_id", type=int)
+    query_parser.add_argument("time", type=parse_time_argument, help="HH:MM (24-hour clock)")
+    query_parser.set_defaults(handler=run_query)
+
+    report_parser = subparsers.add_parser("report", parents=[planner_parser], help="status of all packages")
+    report_parser.add_argument("time", type=parse_time_argument, help="HH:MM (24-hour clock)")
+    report_parser.add_argument("--status", choices=["At the hub", "En route", "Delivered"])
+    report_parser.add_argument("--truck", type=int)
+    report_parser.add_argument("--at-risk", action="store_true", help="only packages delivered late or close to "
+                                                                       "their deadline")
+    report_parser.add_argument("--sort", choices=sorted(sort_keys), default="id")
+    report_parser.add_argument("--page", type=parse_positive_int_argument, help="page number, starting from 1")
+    report_parser.add_argument("--page-size", type=parse_positive_int_argument, default=default_page_size)
+    report_parser.set_defaults(handler=run_report)
+
+    dispatch_parser = subparsers.add_parser("dispatch", help="dispatch trucks one trip at a time over a stream of "
+                                                             "package arrivals")
+    dispatch_parser.add_argument("--arrivals", metavar="PATH", help="CSV file with the arrival time (HH:MM) "
+                                                                    "followed by the packages.csv columns, in time "
+                                                                    "order. Defaults to the manifest")
+    dispatch_parser.add_argument("--budget", type=float, metavar="SECONDS", help="compute time for planning each "
+                                                                             "trip")
+    dispatch_parser.add_argument("--speed", type=parse_speed_argument, metavar="MPH",
+                                 help="average speed of every truck")
+    dispatch_parser.add_argument("--service-minutes", type=parse_minutes_argument, metavar="MINUTES",
+                                 help="time spent at every stop")
+    dispatch_parser.add_argument("--event-log", metavar="PATH", help="archive every event to this event log")
+    dispatch_parser.set_defaults(handler=run_dispatch)
+
+    bench_parser = subparsers.add_parser("bench", help="measure the cost of every startup phase")
+    bench_parser.add_argument("--repeat", type=parse_positive_int_argument, default=5)
+    bench_parser.set_defaults(handler=run_bench)
+
+    return parser
+
+
+def main(argv=None):
+    arguments = build_argument_parser().parse_args(argv)
+    return arguments.handler(arguments) or 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,262 @@
+import os
+import struct
+import time
+from datetime import date, timedelta
+
+# Every event log starts with this header so that other files are never replayed by mistake
+log_header = b"WGUPSLOG\x01"
+
+# Each record is packed as: event type, Truck ID, Package ID (0 for Truck events), milliseconds since midnight and
+# the Truck's mileage at the time of the event. A run record starts the events of every run written to the log and
+# is packed as: event_run, 0, run ID, delivery date as YYYYMMDD and the wall-clock time the run started (seconds
+# since the epoch)
+record_struct = struct.Struct("<BHIId")
+
+# Event types
+event_load = 1
+event_depart = 2
+event_deliver = 3
+event_return = 4
+event_correction = 5
+event_run = 6
+
+event_names = {event_load: "load", event_depart: "depart", event_deliver: "deliver", event_return: "return",
+               event_correction: "correction", event_run: "run"}
+
+# Size of the write buffer used by the EventLogWriter
+write_buffer_size = 64 * 1024
+
+
+# Space-Time Complexity: O(1)
+# Converts a timedelta to whole milliseconds since midnight
+def timedelta_to_milliseconds(time_delta):
+    return int(round(time_delta.total_seconds() * 1000))
+
+
+# Space-Time Complexity: O(1)
+# Converts a date to the YYYYMMDD number stored in a run record, and back
+def date_to_number(run_date):
+    return run_date.year * 10000 + run_date.month * 100 + run_date.day
+
+
+def number_to_date(date_number):
+    return date(date_number // 10000, date_number // 100 % 100, date_number % 100)
+
+
+# Space-Time Complexity: O(1)
+# Cuts a partially written record (or header) off the end of an existing log, e.g. after a crash, so that records
+# appended afterwards stay aligned. A file that does not start with the log header raises a ValueError
+def truncate_partial_record(path):
+    log_size = os.path.getsize(path)
+    with open(path, "rb") as log_file:
+        header = log_file.read(len(log_header))
+
+    if log_size < len(log_header) and log_header.startswith(header):
+        aligned_size = 0
+    elif header == log_header:
+        aligned_size = log_size - (log_size - len(log_header)) % record_struct.size
+    else:
+        raise ValueError("%s is not a delivery event log" % path)
+
+    if aligned_size != log_size:
+        os.truncate(path, aligned_size)
+
+
+# Appends simulation events to a compact, append-only binary log. Records are packed with a fixed size and written
+# through a buffer, so logging adds very little to the simulation. Several runs can be appended to the same log;
+# each one starts with a run record holding its run ID and delivery date
+class EventLogWriter:
+    # Opens the log for appending, writes the header if the log is new and starts a new run for the delivery date
+    # (today unless provided). Runs are numbered from 1 in the order they were appended
+    def __init__(self, path, run_date=None):
+        self.path = path
+        self.run_id = 1
+        if os.path.exists(path):
+            truncate_partial_record(path)
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            for logged_run_id, logged_run_date, logged_start_time in list_runs(path):
+                self.run_id = max(self.run_id, logged_run_id + 1)
+        self.run_date = run_date if run_date is not None else date.today()
+
+        self.log_file = open(path, "ab", buffering=write_buffer_size)
+        if self.log_file.tell() == 0:
+            self.log_file.write(log_header)
+        self.log_file.write(record_struct.pack(event_run, 0, self.run_id, date_to_number(self.run_date), time.time()))
+
+    # Appends a single event to the log
+    def write_event(self, event_type, truck_id, package_id, event_time, mileage):
+        self.log_file.write(record_struct.pack(event_type, truck_id, package_id or 0,
+                                               timedelta_to_milliseconds(event_time), mileage))
+
+    # Returns the current mileage of the Truck based on its latest mileage timestamp
+    def get_truck_mileage(self, truck):
+        if len(truck.mileage_timestamps) == 0:
+            return 0.0
+        return truck.mileage_timestamps[len(truck.mileage_timestamps) - 1][0]
+
+    # Logs that the Package was loaded onto the Truck at the hub
+    def log_load(self, truck, package):
+        self.write_event(event_load, truck.id, package.id_number, truck.time_obj, self.get_truck_mileage(truck))
+
+    # Logs that the Truck departed from the hub carrying the Package
+    def log_depart(self, truck, package):
+        self.write_event(event_depart, truck.id, package.id_number, package.en_route_timestamp,
+                         self.get_truck_mileage(truck))
+
+    # Logs that the Truck delivered the Package
+    def log_deliver(self, truck, package):
+        self.write_event(event_deliver, truck.id, package.id_number, package.delivery_timestamp,
+                         self.get_truck_mileage(truck))
+
+    # Logs that the Truck returned to the hub
+    def log_return(self, truck):
+        self.write_event(event_return, truck.id, 0, truck.time_obj, self.get_truck_mileage(truck))
+
+    # Logs that the delivery address of the Package was corrected at the specified time
+    def log_correction(self, truck, package, correction_time):
+        self.write_event(event_correction, truck.id, package.id_number, correction_time,
+                         self.get_truck_mileage(truck))
+
+    # Writes any buffered records to disk
+    def flush(self):
+        self.log_file.flush()
+
+    # Flushes and closes the log
+    def close(self):
+        self.log_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+# Space-Time Complexity: O(N)
+# Reads the whole event log with a single read and returns an iterator over the packed
+# (event_type, truck_id, package_id, milliseconds, mileage) records
+def iter_raw_records(path):
+    with open(path, "rb") as log_file:
+        data = log_file.read()
+
+    if not data.startswith(log_header):
+        raise ValueError("%s is not a delivery event log" % path)
+
+    # Ignore a partially written record at the end of the log, e.g. after a crash
+    body_size = len(data) - len(log_header)
+    body_size = body_size - body_size % record_struct.size
+
+    return record_struct.iter_unpack(memoryview(data)[len(log_header):len(log_header) + body_size])
+
+
+# Space-Time Complexity: O(N)
+# Returns the runs of the event log as a list of (run_id, delivery date, start time) tuples in the order they were
+# written. Events written before the first run record (by older versions of the writer) belong to run 0
+def list_runs(path):
+    runs = []
+    for event_type, truck_id, package_id, milliseconds, mileage in iter_raw_records(path):
+        if event_type == event_run:
+            runs.append((package_id, number_to_date(milliseconds), mileage))
+        elif len(runs) == 0:
+            runs.append((0, None, None))
+    return runs
+
+
+# Space-Time Complexity: O(N)
+# Returns an iterator over the packed event records of a single run. The latest run is selected unless a run ID is
+# provided, and a ValueError is raised if the log has no such run
+def iter_run_records(path, run_id=None):
+    if run_id is None:
+        runs = list_runs(path)
+        run_id = runs[len(runs) - 1][0] if len(runs) > 0 else 0
+
+    current_run_id = 0
+    found_run = False
+    run_records = []
+    for record in iter_raw_records(path):
+        if record[0] == event_run:
+            current_run_id = record[2]
+            found_run = found_run or current_run_id == run_id
+        elif current_run_id == run_id:
+            found_run = True
+            run_records.append(record)
+
+    if not found_run:
+        raise ValueError("%s has no run %d" % (path, run_id))
+    return iter(run_records)
+
+
+# Space-Time Complexity: O(N)
+# Returns a list of (event_type, truck_id, package_id, event_time, mileage) tuples of a single run (the latest unless
+# a run ID is provided) in the order they were written
+def read_event_log(path, run_id=None):
+    return [(event_type, truck_id, package_id, timedelta(milliseconds=milliseconds), mileage)
+            for event_type, truck_id, package_id, milliseconds, mileage in iter_run_records(path, run_id)]
+
+
+# Space-Time Complexity: O(N)
+# Rebuilds the delivery state at the specified time from a single run of the event log (the latest unless a run ID
+# is provided) without running the simulation again. Returns a dictionary with the status of every logged Package
+# and the mileage of every Truck
+def replay_event_log(path, report_timedelta, run_id=None):
+    report_milliseconds = timedelta_to_milliseconds(report_timedelta)
+    packages = {}
+    trucks = {}
+
+    # Records of a single Truck are written in chronological order, so the latest applicable record wins
+    for event_type, truck_id, package_id, milliseconds, mileage in iter_run_records(path, run_id):
+        if milliseconds > report_milliseconds:
+            continue
+
+        # A correction is logged at the time the address is corrected rather than the Truck's current time, so it
+        # does not change the state of the Truck
+        truck_state = trucks.setdefault(truck_id, {"mileage": 0.0, "at_hub": True, "time": None})
+        if event_type != event_correction:
+            truck_state["mileage"] = mileage
+            truck_state["time"] = timedelta(milliseconds=milliseconds)
+
+        if event_type == event_return:
+            truck_state["at_hub"] = True
+            continue
+
+        package_state = packages.setdefault(package_id, {"status": "At the hub", "truck": None, "timestamp": None,
+                                                         "address_corrected": False})
+        if event_type == event_load:
+            package_state["truck"] = truck_id
+        elif event_type == event_depart:
+            package_state["status"] = "En route"
+            package_state["truck"] = truck_id
+            truck_state["at_hub"] = False
+        elif event_type == event_deliver:
+            package_state["status"] = "Delivered"
+            package_state["truck"] = truck_id
+            package_state["timestamp"] = timedelta(milliseconds=milliseconds)
+        elif event_type == event_correction:
+            package_state["address_corrected"] = True
+
+    return {"packages": packages, "trucks": trucks}
+
+
+if __name__ == "__main__":
+    import sys
+    from datetime import datetime
+
+    # Usage: python event_log.py <log path> <HH:MM> [run ID], the latest run is replayed unless a run ID is provided
+    if len(sys.argv) not in (3, 4) or not os.path.exists(sys.argv[1]):
+        print("Usage: python event_log.py <log path> <HH:MM> [run ID]")
+        sys.exit(1)
+
+    for listed_run_id, listed_run_date, listed_start_time in list_runs(sys.argv[1]):
+        print("Run %d: %s" % (listed_run_id, listed_run_date if listed_run_date is not None else "no run record"))
+
+    report_time = datetime.strptime(sys.argv[2], "%H:%M")
+    selected_run_id = int(sys.argv[3]) if len(sys.argv) == 4 else None
+    state = replay_event_log(sys.argv[1], timedelta(hours=report_time.hour, minutes=report_time.minute),
+                             selected_run_id)
+
+    for replayed_package_id in sorted(state["packages"]):
+        package_state = state["packages"][replayed_package_id]
+        print("[Package ID = %d] \tDelivery Status: %s\tTruck: %s" %
+              (replayed_package_id, package_state["status"], package_state["truck"]))
+    for replayed_truck_id in sorted(state["trucks"]):
+        print("Truck %d's mileage: %0.2f miles" % (replayed_truck_id, state["trucks"][replayed_truck_id]["mileage"]))
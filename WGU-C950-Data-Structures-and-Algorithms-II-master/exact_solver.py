@@ -0,0 +1,195 @@
+from route_plan import copy_plan, simulate_plan
+
+# Largest number of distinct stops on a trip that is routed exactly. The Held-Karp table grows with 2^N * N entries,
+# so larger trips keep their heuristic order
+max_exact_stops = 16
+
+
+# Space-Time Complexity: O(N)
+# Returns the distance of a delivery trip that departs from the hub, delivers the Packages in order and returns
+def trip_distance(problem, trip):
+    distances = problem["distances"]
+    packages = problem["packages"]
+    current_index = problem["hub_index"]
+    distance = 0
+
+    for package_id in trip:
+        address_index = packages[package_id]["address_index"]
+        distance += distances[current_index][address_index]
+        current_index = address_index
+
+    return distance + distances[current_index][problem["hub_index"]]
+
+
+# Space-Time Complexity: O(2^N * N^2)
+# Held-Karp dynamic programming. Returns the order of the stops (address indexes) that gives the shortest tour
+# starting and ending at the hub, along with the distance of that tour
+def solve_exact_tour(problem, stop_indexes):
+    num_stops = len(stop_indexes)
+    if num_stops == 0:
+        return [], 0
+
+    distances = problem["distances"]
+    hub_index = problem["hub_index"]
+    stop_distances = [[distances[a][b] for b in stop_indexes] for a in stop_indexes]
+    full_mask = (1 << num_stops) - 1
+    infinity = float("inf")
+
+    # shortest[mask][j] is the length of the shortest path from the hub through the stops in mask ending at stop j
+    shortest = [[infinity] * num_stops for mask in range(full_mask + 1)]
+    previous = [[-1] * num_stops for mask in range(full_mask + 1)]
+
+    for j in range(num_stops):
+        shortest[1 << j][j] = distances[hub_index][stop_indexes[j]]
+
+    # Masks only ever grow, so visiting them in increasing order processes every subset before its supersets
+    for mask in range(1, full_mask + 1):
+        mask_shortest = shortest[mask]
+        unvisited = [k for k in range(num_stops) if not mask & (1 << k)]
+
+        for j in range(num_stops):
+            path_length = mask_shortest[j]
+            if path_length == infinity:
+                continue
+            distances_from_j = stop_distances[j]
+
+            for k in unvisited:
+                next_mask = mask | (1 << k)
+                next_length = path_length + distances_from_j[k]
+                if next_length < shortest[next_mask][k]:
+                    shortest[next_mask][k] = next_length
+                    previous[next_mask][k] = j
+
+    # Close the tour by returning to the hub from the last stop
+    best_last = None
+    best_length = infinity
+    for j in range(num_stops):
+        tour_length = shortest[full_mask][j] + distances[stop_indexes[j]][hub_index]
+        if tour_length < best_length:
+            best_last = j
+            best_length = tour_length
+
+    # Walk back through the table to rebuild the order of the stops
+    order = []
+    mask = full_mask
+    current = best_last
+    while current != -1:
+        order.append(stop_indexes[current])
+        next_current = previous[mask][current]
+        mask = mask & ~(1 << current)
+        current = next_current
+    order.reverse()
+
+    return order, best_length
+
+
+# Space-Time Complexity: O(2^N * N^2)
+# Returns the trip reordered along the shortest tour, or None if the trip has too many stops to be solved exactly.
+# Packages going to the same address are delivered at the same stop
+def route_trip_exactly(problem, trip):
+    packages = problem["packages"]
+    packages_at_stop = {}
+
+    for package_id in trip:
+        packages_at_stop.setdefault(packages[package_id]["address_index"], []).append(package_id)
+
+    if len(packages_at_stop) > max_exact_stops:
+        return None
+
+    order, length = solve_exact_tour(problem, list(packages_at_stop))
+    return [package_id for address_index in order for package_id in packages_at_stop[address_index]]
+
+
+# Space-Time Complexity: O(T * 2^N * N^2) where T is the number of trips
+# Post-pass that reorders every trip of the plan along its shortest tour. A new order is only kept if it does not
+# make the deadline lateness of the plan worse, since the shortest tour may visit an urgent stop later. The tour is
+# tried in both directions because both have the same distance but deliver the stops at different times
+def exact_post_pass(problem, plan):
+    exact_plan = copy_plan(plan)
+    simulation = simulate_plan(problem, exact_plan)
+
+    for truck_id, trips in exact_plan.items():
+        for trip_index, trip in enumerate(trips):
+            exact_trip = route_trip_exactly(problem, trip)
+            if exact_trip is None or trip_distance(problem, exact_trip) >= trip_distance(problem, trip):
+                continue
+
+            for candidate_trip in (exact_trip, exact_trip[::-1]):
+                trips[trip_index] = candidate_trip
+                candidate_simulation = simulate_plan(problem, exact_plan)
+
+                if (candidate_simulation["late_packages"] <= simulation["late_packages"] and
+                        candidate_simulation["total_lateness"] <= simulation["total_lateness"]):
+                    simulation = candidate_simulation
+                    break
+            else:
+                trips[trip_index] = trip
+
+    return exact_plan
+
+
+# Space-Time Complexity: O(T * 2^N * N^2) where T is the number of trips
+# Benchmark oracle: returns the distance of every trip of the plan compared with the shortest possible tour over the
+# same stops. The gap is how much longer the heuristic trip is, as a percentage of the optimal distance
+def measure_optimality_gap(problem, plan):
+    trip_reports = []
+
+    for truck_id, trips in plan.items():
+        for trip_index, trip in enumerate(trips):
+            heuristic_distance = trip_distance(problem, trip)
+            exact_trip = route_trip_exactly(problem, trip)
+            optimal_distance = trip_distance(problem, exact_trip) if exact_trip is not None else None
+
+            if optimal_distance is None:
+                gap_percent = None
+            elif optimal_distance > 0:
+                gap_percent = (heuristic_distance - optimal_distance) / optimal_distance * 100
+            else:
+                gap_percent = 0.0
+
+            trip_reports.append({
+                "truck": truck_id,
+                "trip": trip_index + 1,
+                "stops": len(set(problem["packages"][package_id]["address_index"] for package_id in trip)),
+                "heuristic_distance": heuristic_distance,
+                "optimal_distance": optimal_distance,
+                "gap_percent": gap_percent
+            })
+
+    return trip_reports
+
+
+# Prints the optimality gap of every trip of the plan
+def print_optimality_gap(heuristic_name, trip_reports):
+    print("=========================================")
+    print("Optimality gap of the " + heuristic_name + " plan")
+    print("=========================================")
+
+    for report in trip_reports:
+        if report["optimal_distance"] is None:
+            print("Truck %d trip %d: %d stops, %0.2f miles (too many stops to solve exactly)" %
+                  (report["truck"], report["trip"], report["stops"], report["heuristic_distance"]))
+        else:
+            print("Truck %d trip %d: %d stops, %0.2f miles, optimal %0.2f miles, gap %0.1f%%" %
+                  (report["truck"], report["trip"], report["stops"], report["heuristic_distance"],
+                   report["optimal_distance"], report["gap_percent"]))
+
+
+if __name__ == "__main__":
+    import sys
+
+    from main import build_delivery_plan
+    from optimizer import optimize_plan
+    from route_plan import build_routing_problem, extract_plan
+
+    # An optional optimizer time budget in seconds may be provided as the first command-line argument
+    budget = float(sys.argv[1]) if len(sys.argv) > 1 else 0
+
+    delivery_ht, truck_list = build_delivery_plan()
+    routing_problem = build_routing_problem(delivery_ht, truck_list)
+    greedy_plan = extract_plan(delivery_ht, truck_list)
+    print_optimality_gap("nearest neighbour", measure_optimality_gap(routing_problem, greedy_plan))
+
+    if budget > 0:
+        optimized_plan, optimized_cost = optimize_plan(routing_problem, greedy_plan, budget, seed=1)
+        print_optimality_gap("large neighbourhood search", measure_optimality_gap(routing_problem, optimized_plan))
@@ -1,44 +1,83 @@
 # Salvador Amaya, ID: 010348952
 
 import csv
+import time
+from bisect import bisect_right
 from datetime import datetime, timedelta
 
 from Driver import Driver
 from HashTable import HashTable
 from Package import Package
+from report import build_timeline_index, iter_report_rows, write_report
 from Truck import Truck
 
 # Constants used to change the total number of Trucks and Drivers
 num_trucks = 3
 num_drivers = 2
 
+# Seconds of wall-clock time that the optimizer may spend improving the greedy plan, and the seeds that are run in
+# parallel processes. A time budget of 0 keeps the greedy plan
+optimizer_time_budget = 0
+optimizer_seeds = (1, 2, 3, 4)
+
+# Reorders every delivery trip along its shortest tour once the plan is built
+use_exact_routing = False
+
+# TravelTimeModel with per-Truck speeds, per-stop service time and time-of-day speed profile used to time the plan.
+# When set, the Trucks drive with the model while the greedy plan is built, and the final plan is timed with the
+# same model. None keeps the Trucks' own constant speed
+travel_time_model = None
+
+# Seconds of wall-clock time that the optimizer may spend repairing a greedy plan that misses deadlines under
+# the travel-time model, when the optimizer is not already enabled
+deadline_repair_time_budget = 5
+
+# Path of the precompiled snapshot of the addresses, distances and Packages parsed from the CSV files
+input_snapshot_path = "inputs.snapshot"
+
+# Parsed input data, loaded on first use by get_input_data, and the signature of the input files it was loaded from
+input_data = None
+input_data_signature = None
+
+# Path of the append-only event log that records every simulation event. None disables the event log
+event_log_path = None
+
+# Corrected address, city, state and ZIP code of the Packages listed with a wrong address
+address_corrections = {9: ("410 S State St", "Salt Lake City", "UT", "84111")}
+
 # Space-Time Complexity: O(N)
-# Parses Package information from the 'packages.csv' file to create Package objects that are inserted into the HashTable
-def load_package_data(ht):
+# Parses the rows of the 'packages.csv' file. Each row holds the Package's ID, address, city, state, ZIP code,
+# deadline, mass and special notes
+def parse_package_rows():
     # Open the packages CSV file
     with open('packages.csv') as csv_file:
         # Create a reader object which will iterate over lines in the packages.csv file
         csv_reader = csv.reader(csv_file, delimiter=',')
+        return [row for row in csv_reader]
 
-        # Iterate through the reader and parse the information from each row
-        for row in csv_reader:
-            # Store the parsed data as variables and pass them as input for creating a new Package object
-            id_number = int(row[0])
-            delivery_address = row[1]
-            delivery_city = row[2]
-            delivery_state = row[3]
-            delivery_zip = row[4]
-            delivery_deadline = row[5]
-            package_mass = row[6]
-            special_notes = row[7]
-            delivery_status = "At the hub"
-
-            package = Package(id_number, delivery_address, delivery_city, delivery_state, delivery_zip,
-                              delivery_deadline, package_mass,
-                              special_notes, delivery_status)
-
-            # Insert the newly created Package object into the HashTable
-            ht.insert(package)
+
+# Space-Time Complexity: O(N)
+# Creates Package objects from the parsed Package information and inserts them into the HashTable
+def load_package_data(ht):
+    # Iterate through the parsed rows and create a Package from each row
+    for row in get_input_data()["package_rows"]:
+        # Store the parsed data as variables and pass them as input for creating a new Package object
+        id_number = int(row[0])
+        delivery_address = row[1]
+        delivery_city = row[2]
+        delivery_state = row[3]
+        delivery_zip = row[4]
+        delivery_deadline = row[5]
+        package_mass = row[6]
+        special_notes = row[7]
+        delivery_status = "At the hub"
+
+        package = Package(id_number, delivery_address, delivery_city, delivery_state, delivery_zip,
+                          delivery_deadline, package_mass,
+                          special_notes, delivery_status)
+
+        # Insert the newly created Package object into the HashTable
+        ht.insert(package)
 
 
 # Space-Time Complexity: O(N^2)
@@ -49,14 +88,15 @@ def load_distance_data():
         # Create a reader object which will iterate over lines in the 'distances.csv' file
         csv_reader = csv.reader(csv_file, delimiter=',')
 
-        # Create the list that will store the distance data
-        num_addresses = get_num_addresses()
+        # The table has one row per address, so the number of rows determines the size of the list
+        distance_rows = [row for row in csv_reader]
+        num_addresses = len(distance_rows)
         distance_data = [[0 for x in range(num_addresses)] for y in range(num_addresses)]
 
-        # Iterate through the reader and parse the distance information between each address
+        # Iterate through the rows and parse the distance information between each address
         src_address_index = 0
 
-        for src_address in csv_reader:
+        for src_address in distance_rows:
             for dest_address_index in range(num_addresses):
                 if src_address[dest_address_index] != '':
                     distance_data[src_address_index][dest_address_index] = float(src_address[dest_address_index])
@@ -85,33 +125,48 @@ def load_address_data():
     return address_list
 
 
-# Space-Time Complexity: O(N)
+# Space-Time Complexity: O(1) after the input data is loaded
 # Returns the number of addresses found in the 'addresses.csv' file based on the number of rows
 def get_num_addresses():
-    num_addresses = 0
-    # Open the 'addresses.csv'  file to count the number of rows in the file
-    with open('addresses.csv') as csv_file:
-        # Create a reader object which will iterate over lines in the 'distances.csv' file
-        csv_reader = csv.reader(csv_file, delimiter=',')
+    return len(get_input_data()["addresses"])
+
+
+# Space-Time Complexity: O(1) after the first call
+# Returns the parsed addresses, distances and Package rows. They are read once per process, from the precompiled
+# input snapshot when it is up to date with the CSV files, or else from the CSV files
+def get_input_data():
+    global input_data, input_data_signature
 
-        # Count the number of rows/columns, which will determine the size of the list
-        for row in csv_reader:
-            num_addresses = num_addresses + 1
+    if input_data is None:
+        from snapshot import get_input_signature, load_input_data
 
-    return num_addresses
+        # The signature is taken first, so input files changed while they are being read are read again next time
+        input_data_signature = get_input_signature()
+        input_data = load_input_data(input_snapshot_path)
+    return input_data
+
+
+# Space-Time Complexity: O(1)
+# Drops the parsed input data when the input files changed since it was loaded, so that the next plan reads them
+# again. Returns True if the input data was dropped
+def refresh_input_data():
+    global input_data
+
+    from snapshot import get_input_signature
+
+    if input_data is None or input_data_signature == get_input_signature():
+        return False
+    input_data = None
+    return True
 
 
 # Space-Time Complexity: O(1)
 # Returns the distance between two addresses
 def distance_between(address1, address2):
-    distance_list = load_distance_data()
-    address_list = load_address_data()
-
-    # Find the index of both addresses
-    address1_index = address_list.index(address1)
-    address2_index = address_list.index(address2)
+    data = get_input_data()
+    address_index = data["address_index"]
 
-    return distance_list[address1_index][address2_index]
+    return data["distances"][address_index[address1]][address_index[address2]]
 
 
 # Space-Time Complexity: O(N)
@@ -127,7 +182,7 @@ def initialize_trucks_drivers(NUM_TRUCKS, NUM_DRIVERS):
     # Initialize the Truck objects
     for current_truck_num in range(1, num_trucks_drivers + 1, 1):
         truck_id = current_truck_num
-        truck = Truck(truck_id)
+        truck = Truck(truck_id, travel_model=travel_time_model)
         truck_list.append(truck)
 
     # Initialize the Driver objects
@@ -142,9 +197,9 @@ def initialize_trucks_drivers(NUM_TRUCKS, NUM_DRIVERS):
 
 # Space-Time Complexity: O(N^4)
 # Efficiently assigns Packages to the Truck until either all assignable Packages are assigned or until the Truck is full
-def assign_packages(ht, truck):
+def assign_packages(ht, truck, event_log=None):
     # Assign Packages until the Truck can no longer assign more Packages
-    while len(get_assignable_packages(ht, truck)) > 0 and not truck.is_full() and truck.at_hub is True:
+    while len(get_fitting_packages(ht, truck)) > 0 and not truck.is_full() and truck.at_hub is True:
         # If the package_list is empty for the Truck, the current address will be set to the mail hub
         if len(truck.packages_id_list) == 0:
             address = truck.hub_address
@@ -156,17 +211,18 @@ def assign_packages(ht, truck):
 
         # Space-Time Complexity: O(N)
         # Assign the closest Package to the last address
-        nearest_package = find_nearest_package_in_list(address, get_assignable_packages(ht, truck))
+        nearest_package = find_nearest_package_in_list(address, get_fitting_packages(ht, truck))
         truck.assign_package(nearest_package)
+        if event_log is not None:
+            event_log.log_load(truck, nearest_package)
 
         # Space-Time Complexity: O(N)
         # Handle Wrong Address case
-        if nearest_package.id_number == 9:
-            nearest_package.delivery_address = "410 S State St"
-            nearest_package.delivery_city = "Salt Lake City"
-            nearest_package.delivery_state = "UT"
-            nearest_package.delivery_zip = "84111"
+        if nearest_package.id_number in address_corrections:
+            correct_package_address(nearest_package)
             sort_truck_package_list(ht, truck)
+            if event_log is not None:
+                event_log.log_correction(truck, nearest_package, nearest_package.get_delayed_arrival_time())
 
         # Space-Time Complexity: O(N^3) worst-case
         # If we've assigned a Package that exists in the associated Packages list, then ensure that we add the rest of
@@ -176,10 +232,19 @@ def assign_packages(ht, truck):
                 for associated_package in list:
                     if associated_package.is_truck_assigned() is False:
                         truck.assign_package(associated_package)
+                        if event_log is not None:
+                            event_log.log_load(truck, associated_package)
         # If we added associated Packages, sort the truck's Package list to ensure it the route is optimized
         sort_truck_package_list(ht, truck)
 
 
+# Space-Time Complexity: O(1)
+# Replaces the wrong delivery address of the Package with its corrected address
+def correct_package_address(package):
+    (package.delivery_address, package.delivery_city, package.delivery_state,
+     package.delivery_zip) = address_corrections[package.id_number]
+
+
 # Space-Time Complexity: O(N^2)
 # Sorts the list of Packages in the Truck to be ordered with priority of the shortest distance between each Package
 def sort_truck_package_list(ht, truck):
@@ -231,14 +296,22 @@ def find_nearest_package_in_list(current_address, package_list):
 
 # Space-Time Complexity: O(N^5)
 # Deliver Packages until all Packages in the HashTable are delivered
-def deliver_all_packages(ht, truck_list):
+def deliver_all_packages(ht, truck_list, event_log=None, risk_tracker=None):
+    # Number of delivery trips of every Truck, each trip is tracked as the route (truck_id, trip_index)
+    trip_counts = {truck.id: 0 for truck in truck_list}
+    delivered_routes = set()
+
     while not all_packages_delivered(ht):
         for truck in truck_list:
             # Set the Delivery Status to "En route" for all Packages that will be delivered during this delivery trip
             truck.set_packages_en_route(ht)
+            if event_log is not None:
+                for package_id in truck.packages_id_list:
+                    event_log.log_depart(truck, ht.lookup(package_id))
 
             current_address = truck.hub_address
             current_package_index = 0
+            trip_arrivals = []
 
             # Deliver all the Packages that are loaded onto the Truck
             while len(truck.packages_id_list) > 0:
@@ -249,15 +322,34 @@ def deliver_all_packages(ht, truck_list):
                 # Calculate the distance traveled and add it to the total mileage covered by the Truck
                 distance_traveled = distance_between(current_address, package.delivery_address)
                 truck.deliver_package(ht, package_id, distance_traveled)
+                if event_log is not None:
+                    event_log.log_deliver(truck, package)
+                trip_arrivals.append((package_id, package.delivery_timestamp))
 
                 # After all calculations, the Package's delivery address is now the current address
                 current_address = package.delivery_address
 
             # After delivering all Packages, the Truck returns to the hub
             truck.send_back_to_hub(distance_between(current_address, truck.hub_address))
+            if event_log is not None:
+                event_log.log_return(truck)
+
+            # Update the deadline slack of every Package delivered on this trip
+            if len(trip_arrivals) > 0:
+                route_key = (truck.id, trip_counts[truck.id])
+                trip_counts[truck.id] = trip_counts[truck.id] + 1
+                if risk_tracker is not None:
+                    risk_tracker.update_route(route_key, trip_arrivals)
+                    delivered_routes.add(route_key)
         # Assign more Packages
         for truck in truck_list:
-            assign_packages(ht, truck)
+            assign_packages(ht, truck, event_log)
+
+    # Trips of a previous plan that were not driven again stop being tracked
+    if risk_tracker is not None:
+        for route_key in risk_tracker.get_route_keys():
+            if route_key not in delivered_routes:
+                risk_tracker.remove_route(route_key)
 
 
 # Space-Time Complexity: O(N)
@@ -298,6 +390,26 @@ def get_assignable_packages(ht, truck):
     return assignable_packages
 
 
+# Space-Time Complexity: O(N^3)
+# Returns the assignable Packages that fit on the Truck together with every unassigned Package that they must be
+# delivered with, so that loading a group of associated Packages never exceeds the Truck's capacity
+def get_fitting_packages(ht, truck):
+    free_capacity = truck.capacity - len(truck.packages_id_list)
+    associated_package_lists = get_lists_associated_packages(ht)
+    fitting_packages = []
+
+    for package in get_assignable_packages(ht, truck):
+        num_packages_to_load = 1
+        for list in associated_package_lists:
+            if package in list:
+                num_packages_to_load = len([p for p in list if p.is_truck_assigned() is False])
+
+        if num_packages_to_load <= free_capacity:
+            fitting_packages.append(package)
+
+    return fitting_packages
+
+
 # Space-Time Complexity: O(N^3)
 # Returns a list of unassigned Packages that cannot be assigned to the provided Truck
 def get_unassignable_packages(ht, truck):
@@ -377,11 +489,13 @@ def get_lists_associated_packages(ht):
 
 # Space-Time Complexity: O(N^2)
 # Helper function for assign_packages_associative Parses the Special Notes of a Package and returns a list of
-# Packages that the inputted Package must be delivered with
-def find_directly_associated_packages(ht, package):
+# Packages that the inputted Package must be delivered with. The list is shared with the recursive calls so that
+# Packages whose notes refer to each other are only visited once
+def find_directly_associated_packages(ht, package, associated_packages=None):
     if "Must be delivered with" in package.special_notes:
         # Create a new list
-        associated_packages = [package]
+        if associated_packages is None:
+            associated_packages = [package]
 
         # Find the IDs of other packages that this current Package must be delivered with
         special_notes_commas_excluded = package.special_notes.replace(",", " ")
@@ -391,13 +505,9 @@ def find_directly_associated_packages(ht, package):
         # Append IDs of additional Packages that must be delivered with the Package passed in the parameter
         for package_id in package_ids_list:
             package = ht.lookup(package_id)
-            associated_packages.append(package)
-            additional_packages = find_directly_associated_packages(ht, package)
-
-            if additional_packages is not None:
-                for additional_package in additional_packages:
-                    if additional_package not in associated_packages:
-                        associated_packages.append(additional_package)
+            if package not in associated_packages:
+                associated_packages.append(package)
+                find_directly_associated_packages(ht, package, associated_packages)
 
         return associated_packages
 
@@ -440,15 +550,10 @@ def general_report(ht, truck_list):
     # Prompt for a time to generate the report
     report_datetime = prompt_time()
 
-    # Display the status of all Packages at the time of the report
-    print("=========================================")
-    print("Status report of all packages at " + report_datetime.strftime("%I:%M %p"))
-    print("=========================================")
-
-    # For each Package, print out all the delivery information and status at the requested time
-    for package in range(1, len(ht.package_table) + 1):
-        if package is not None:
-            display_package_query(ht, package, report_datetime)
+    # Display the status of all Packages at the time of the report. The rows are generated from the timeline index
+    # and written all at once
+    report_timedelta = timedelta(hours=report_datetime.hour, minutes=report_datetime.minute)
+    write_report(report_timedelta, iter_report_rows(build_timeline_index(ht), report_timedelta))
 
     # Print the total mileage of all Truck at the specified time
     print_total_mileage_at_time(truck_list, report_datetime)
@@ -468,26 +573,38 @@ def print_total_mileage_at_time(truck_list, report_datetime):
     # For each truck, find the amount of distance covered closest to the specified report time
     for truck in truck_list:
         if len(truck.mileage_timestamps) > 0:
-            index = len(truck.mileage_timestamps) - 1
-
-            while index > 0:
-                # Respective mileage and timestamp extracted from the Truck's mileage_timestamp list
-                timestamp_mileage = truck.mileage_timestamps[index][0]
-                timestamp_timedelta = truck.mileage_timestamps[index][1]
-
-                if timestamp_timedelta <= report_timedelta:
-                    total_mileage += timestamp_mileage
-                    print("Truck %d's mileage: %0.2f miles" % (truck.id, timestamp_mileage))
-                    break
-                else:
-                    index = index - 1
-            if index == 0:
-                print("Truck %d's mileage: %0.2f miles" % (truck.id, 0.00))
+            timestamp_mileage = get_truck_mileage_at_time(truck, report_timedelta)
+            total_mileage += timestamp_mileage
+            print("Truck %d's mileage: %0.2f miles" % (truck.id, timestamp_mileage))
     # Print the total mileage at the specified time
     print("\nThe total mileage of all trucks at " + report_datetime.strftime("%I:%M %p") + " is %0.2f miles" %
         total_mileage)
 
 
+# Space-Time Complexity: O(log N)
+# Returns the mileage covered by the Truck at the specified time using the Truck's mileage_timestamp list
+def get_truck_mileage_at_time(truck, report_timedelta):
+    # The mileage_timestamp list is appended in chronological order, so binary search for the last timestamp that
+    # is not later than the specified time
+    index = bisect_right(truck.mileage_timestamps, report_timedelta, key=lambda timestamp: timestamp[1]) - 1
+
+    # The first timestamp is the Truck's starting point at the hub, so no mileage has been covered yet
+    if index <= 0:
+        return 0.00
+    return truck.mileage_timestamps[index][0]
+
+
+# Space-Time Complexity: O(1)
+# Returns the delivery status of the Package at the specified time along with the timestamp tied to that status
+def get_package_status_at_time(package, report_timedelta):
+    if package.en_route_timestamp > report_timedelta:
+        return "At the hub", None
+    elif package.delivery_timestamp > report_timedelta:
+        return "En route", package.delivery_timestamp
+    else:
+        return "Delivered", package.delivery_timestamp
+
+
 # Queries and displays Package information
 def query_specific_package(ht, truck_list):
     # Prompt the user for a time to generate a report and the specific Package to query
@@ -516,16 +633,18 @@ def display_package_query(ht, package_id, report_datetime):
     package_info_status = "[Package ID = %d] " % package.id_number
 
     # Generate the delivery status information
-    if package.en_route_timestamp > report_timedelta:
+    delivery_status, status_timestamp = get_package_status_at_time(package, report_timedelta)
+
+    if delivery_status == "At the hub":
         package_info_status += "\tDelivery Status: At the hub"
-    elif package.delivery_timestamp > report_timedelta:
+    elif delivery_status == "En route":
         # Convert the delivery timestamp from timedelta to datetime for printing purposes
-        delivery_timestamp_datetime = datetime.strptime(str(package.delivery_timestamp), "%H:%M:%S")
+        delivery_timestamp_datetime = datetime.strptime(str(status_timestamp), "%H:%M:%S")
         package_info_status += "\tDelivery Status: En route to delivery address, expected delivery at " + delivery_timestamp_datetime.strftime(
             "%I:%M %p")
     else:
         # Convert the delivery timestamp from timedelta to datetime for printing purposes
-        delivery_timestamp_datetime = datetime.strptime(str(package.delivery_timestamp), "%H:%M:%S")
+        delivery_timestamp_datetime = datetime.strptime(str(status_timestamp), "%H:%M:%S")
         package_info_status += "\tDelivery Status: Delivered at " + delivery_timestamp_datetime.strftime("%I:%M %p")
 
     # Build the Delivery Information
@@ -572,11 +691,33 @@ def prompt_package_id(ht):
     return package_id
 
 
-def main():
+# Space-Time Complexity: O(1)
+# Records the seconds elapsed since the start of a planning phase when phase times are collected. Returns the end of
+# the phase, which is the start of the next phase
+def record_phase_time(phase_times, phase_name, phase_start):
+    phase_end = time.perf_counter()
+    if phase_times is not None:
+        phase_times[phase_name] = phase_end - phase_start
+    return phase_end
+
+
+# Space-Time Complexity: O(N^5)
+# Loads the Package data, plans every delivery trip and simulates the full day. Returns the populated HashTable and
+# the list of Trucks so that the plan can be queried without being recomputed. When a dictionary is provided, the
+# seconds spent in every planning phase are recorded in it. When a DeadlineRiskTracker is provided, it follows the
+# plan as it is built and only the trips that changed since the previous plan are recorded in it again
+def build_delivery_plan(phase_times=None, risk_tracker=None):
+    phase_start = time.perf_counter()
+
     # Initialize a HashTable and load the package data into the HashTable
     delivery_ht = HashTable()
     load_package_data(delivery_ht)
 
+    if risk_tracker is not None:
+        for package in delivery_ht.package_table:
+            if package is not None:
+                risk_tracker.set_deadline(package.id_number, package.get_delivery_deadline_timedelta())
+
     # Create the Trucks and Drivers
     truck_list, driver_list = initialize_trucks_drivers(num_trucks, num_drivers)
 
@@ -588,16 +729,68 @@ def main():
             if delayed_start_time is None or delayed_start_time > package.get_delayed_arrival_time():
                 delayed_start_time = package.get_delayed_arrival_time()
 
-    if len(truck_list) > 1:
+    if len(truck_list) > 1 and delayed_start_time is not None:
         last_truck_index = len(truck_list) - 1
         truck_list[last_truck_index].time_obj = delayed_start_time
 
-    # Assign all the Packages to the Trucks
-    for truck in truck_list:
-        assign_packages(delivery_ht, truck)
+    # Record the simulation events of the final plan. When the plan is improved after the greedy simulation, only
+    # the improved plan is recorded
+    event_log = None
+    if event_log_path is not None:
+        from event_log import EventLogWriter
+        event_log = EventLogWriter(event_log_path)
+
+    # The writer is closed even if planning fails, so the buffered events of the run are not lost
+    try:
+        improve_plan = optimizer_time_budget > 0 or use_exact_routing or travel_time_model is not None
+        greedy_event_log = event_log if not improve_plan else None
+        phase_start = record_phase_time(phase_times, "load", phase_start)
+
+        # Assign all the Packages to the Trucks
+        for truck in truck_list:
+            assign_packages(delivery_ht, truck, greedy_event_log)
+
+        # Deliver Packages until all Packages are delivered
+        deliver_all_packages(delivery_ht, truck_list, greedy_event_log, risk_tracker)
+        phase_start = record_phase_time(phase_times, "greedy", phase_start)
 
-    # Deliver Packages until all Packages are delivered
-    deliver_all_packages(delivery_ht, truck_list)
+        # Improve the greedy plan by moving Packages between trips and Trucks within the optimizer's time budget, and
+        # reorder every trip along its shortest tour. The final plan is timed with the travel-time model
+        if improve_plan:
+            from route_plan import apply_plan, build_routing_problem, extract_plan, simulate_plan
+
+            routing_problem = build_routing_problem(delivery_ht, truck_list, travel_time_model)
+            plan = extract_plan(delivery_ht, truck_list)
+
+            # When the greedy plan misses deadlines under the travel-time model, the optimizer repairs it even if it
+            # was not enabled
+            time_budget = optimizer_time_budget
+            if time_budget <= 0 and travel_time_model is not None:
+                if simulate_plan(routing_problem, plan)["late_packages"] > 0:
+                    time_budget = deadline_repair_time_budget
+
+            if time_budget > 0:
+                from optimizer import optimize_plan_parallel
+                plan, plan_cost = optimize_plan_parallel(routing_problem, plan, time_budget, optimizer_seeds)
+                phase_start = record_phase_time(phase_times, "optimize", phase_start)
+
+            if use_exact_routing:
+                from exact_solver import exact_post_pass
+                plan = exact_post_pass(routing_problem, plan)
+                phase_start = record_phase_time(phase_times, "exact", phase_start)
+
+            apply_plan(delivery_ht, truck_list, routing_problem, plan, event_log, risk_tracker)
+            record_phase_time(phase_times, "apply", phase_start)
+    finally:
+        if event_log is not None:
+            event_log.close()
+
+    return delivery_ht, truck_list
+
+
+def main():
+    # Plan and simulate the deliveries for the day
+    delivery_ht, truck_list = build_delivery_plan()
 
     # Display the menu options
     prompt_interactive_menu(delivery_ht, truck_list)
@@ -0,0 +1,279 @@
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+from DeadlineRiskTracker import DeadlineRiskTracker
+from route_plan import copy_plan, find_plan_violations, record_truck_routes, simulate_plan
+
+# Cost added for every minute a Package is delivered after its deadline
+lateness_penalty_per_minute = 100
+
+# Cost added for every broken constraint, which is large enough that an infeasible plan is never kept as the best
+violation_penalty = 100000
+
+# Fraction of the Packages that is removed from the plan by a single destroy move
+destroy_fraction = 0.15
+
+# Simulated annealing temperatures, as fractions of the cost of the initial plan
+initial_temperature_ratio = 0.02
+final_temperature_ratio = 0.0001
+
+# The search stops before the time budget runs out once the best plan has not improved for this many iterations
+# while it delivers every Package with a deadline at least early_stop_min_slack ahead of its deadline
+early_stop_iterations = 300
+early_stop_min_slack = timedelta(minutes=10)
+
+
+# Space-Time Complexity: O(N)
+# Returns the cost of the plan. Lower is better: the total mileage plus penalties for late Packages and for every
+# broken constraint. When a dictionary of Truck simulations is provided, only the Trucks whose trips changed since
+# the last call are simulated again
+def plan_cost(problem, plan, truck_simulations=None):
+    simulation = simulate_plan(problem, plan, truck_simulations=truck_simulations)
+    lateness_minutes = simulation["total_lateness"].total_seconds() / 60
+
+    return (simulation["total_mileage"] + lateness_penalty_per_minute * lateness_minutes +
+            violation_penalty * len(find_plan_violations(problem, plan)))
+
+
+# Space-Time Complexity: O(N)
+# Returns the units moved by the destroy and repair moves. Packages that must be delivered together always move
+# as a single unit so that they stay on the same Truck and delivery trip
+def get_package_units(problem):
+    grouped_ids = set()
+    units = []
+
+    for group in problem["groups"]:
+        units.append(list(group))
+        grouped_ids.update(group)
+
+    for package_id in problem["packages"]:
+        if package_id not in grouped_ids:
+            units.append([package_id])
+
+    return units
+
+
+# Space-Time Complexity: O(N)
+# Returns the Truck ID that every Package of the unit is required to be on, or None if any Truck can be used
+def get_unit_required_truck(problem, unit):
+    for package_id in unit:
+        required_truck = problem["packages"][package_id]["required_truck"]
+        if required_truck is not None:
+            return required_truck
+    return None
+
+
+# Space-Time Complexity: O(N)
+# Destroy move: removes the selected units from the plan and drops any delivery trip that becomes empty
+def remove_units(plan, removed_units):
+    removed_ids = set(package_id for unit in removed_units for package_id in unit)
+
+    for truck_id in plan:
+        trips = [[package_id for package_id in trip if package_id not in removed_ids] for trip in plan[truck_id]]
+        plan[truck_id] = [trip for trip in trips if len(trip) > 0]
+
+
+# Space-Time Complexity: O(N)
+# Destroy move: selects random units anywhere in the plan
+def select_random_units(problem, units, num_units, rng):
+    return rng.sample(units, num_units)
+
+
+# Space-Time Complexity: O(N log N)
+# Destroy move: selects a random unit and the units delivered closest to it, so that a whole area of the map is
+# rebuilt and Packages can move between Trucks and trips
+def select_related_units(problem, units, num_units, rng):
+    distances = problem["distances"]
+    packages = problem["packages"]
+    seed_index = packages[rng.choice(units)[0]]["address_index"]
+
+    def distance_to_seed(unit):
+        return min(distances[seed_index][packages[package_id]["address_index"]] for package_id in unit)
+
+    return sorted(units, key=distance_to_seed)[:num_units]
+
+
+# Space-Time Complexity: O(N)
+# Returns the position in the trip and the added distance of the cheapest place to deliver the Package
+def find_cheapest_position(problem, trip, package_id):
+    distances = problem["distances"]
+    packages = problem["packages"]
+    hub_index = problem["hub_index"]
+    address_index = packages[package_id]["address_index"]
+
+    best_position = None
+    best_added_distance = None
+
+    previous_index = hub_index
+    for position in range(len(trip) + 1):
+        next_index = packages[trip[position]]["address_index"] if position < len(trip) else hub_index
+        added_distance = (distances[previous_index][address_index] + distances[address_index][next_index] -
+                          distances[previous_index][next_index])
+
+        if best_added_distance is None or added_distance < best_added_distance:
+            best_position = position
+            best_added_distance = added_distance
+        previous_index = next_index
+
+    return best_position, best_added_distance
+
+
+# Space-Time Complexity: O(N^2)
+# Repair move: inserts every removed unit at the cheapest feasible place across all Trucks and trips, or on a new
+# trip when no existing trip has room. Candidates are compared with the full plan cost so that deadlines and
+# delayed Packages are taken into account. A candidate only changes one Truck, so only that Truck is simulated
+def insert_units(problem, plan, removed_units, rng, truck_simulations=None):
+    rng.shuffle(removed_units)
+
+    for unit in removed_units:
+        required_truck = get_unit_required_truck(problem, unit)
+        best_plan = None
+        best_cost = None
+
+        for truck_id, trips in plan.items():
+            if required_truck is not None and required_truck != truck_id:
+                continue
+            capacity = problem["trucks"][truck_id]["capacity"]
+
+            # Every existing trip with enough room and a new trip at the end of the day are candidates
+            for trip_index in range(len(trips) + 1):
+                if trip_index < len(trips) and len(trips[trip_index]) + len(unit) > capacity:
+                    continue
+
+                candidate_plan = copy_plan(plan)
+                if trip_index == len(trips):
+                    candidate_plan[truck_id].append([])
+                candidate_trip = candidate_plan[truck_id][trip_index]
+
+                for package_id in unit:
+                    position, added_distance = find_cheapest_position(problem, candidate_trip, package_id)
+                    candidate_trip.insert(position, package_id)
+
+                candidate_cost = plan_cost(problem, candidate_plan, truck_simulations)
+                if best_cost is None or candidate_cost < best_cost:
+                    best_plan = candidate_plan
+                    best_cost = candidate_cost
+
+        # Units that cannot be placed on any Truck are left out and penalized as undelivered by the plan cost
+        if best_plan is not None:
+            plan.clear()
+            plan.update(best_plan)
+
+
+# Space-Time Complexity: O(I * N^3) where I is the number of iterations that fit in the time budget
+# Improves the plan with large neighbourhood search and simulated annealing acceptance. Each iteration destroys
+# part of the current plan and repairs it. The best plan found so far is returned when the time budget (in seconds)
+# or the optional iteration limit runs out, or early once the best plan stops improving with every deadline met.
+# A DeadlineRiskTracker follows the current plan and only the trips of the Trucks changed by an accepted move are
+# recorded in it again
+def optimize_plan(problem, initial_plan, time_budget=30, seed=None, max_iterations=None):
+    rng = random.Random(seed)
+    units = get_package_units(problem)
+    num_units = max(1, int(len(problem["packages"]) * destroy_fraction))
+    num_units = min(num_units, len(units))
+    destroy_moves = [select_random_units, select_related_units]
+    truck_simulations = {}
+
+    current_plan = copy_plan(initial_plan)
+    current_cost = plan_cost(problem, current_plan, truck_simulations)
+    best_plan = copy_plan(current_plan)
+    best_cost = current_cost
+
+    risk_tracker = DeadlineRiskTracker({package_id: package["deadline"]
+                                        for package_id, package in problem["packages"].items()})
+    for truck_id in current_plan:
+        record_truck_routes(risk_tracker, truck_id, truck_simulations[truck_id][1])
+    best_risk = risk_tracker.get_summary()
+    best_iteration = 0
+
+    initial_temperature = max(current_cost * initial_temperature_ratio, 1e-9)
+    final_temperature = max(current_cost * final_temperature_ratio, 1e-9)
+
+    start_time = time.monotonic()
+    iteration = 0
+
+    while max_iterations is None or iteration < max_iterations:
+        elapsed_fraction = (time.monotonic() - start_time) / time_budget if time_budget > 0 else 1
+        if elapsed_fraction >= 1:
+            break
+        if iteration - best_iteration >= early_stop_iterations and is_risk_settled(best_risk):
+            break
+        iteration = iteration + 1
+
+        # Destroy part of the plan and repair it
+        candidate_plan = copy_plan(current_plan)
+        removed_units = rng.choice(destroy_moves)(problem, units, num_units, rng)
+        remove_units(candidate_plan, removed_units)
+        insert_units(problem, candidate_plan, list(removed_units), rng, truck_simulations)
+        candidate_cost = plan_cost(problem, candidate_plan, truck_simulations)
+
+        # Cool the temperature down geometrically over the time budget
+        temperature = initial_temperature * (final_temperature / initial_temperature) ** elapsed_fraction
+
+        # Always accept improvements and sometimes accept worse plans to escape local minima
+        cost_delta = candidate_cost - current_cost
+        if cost_delta <= 0 or rng.random() < math.exp(-cost_delta / temperature):
+            # The Truck simulations hold the candidate plan, only the Trucks it changed are recorded again
+            for truck_id in candidate_plan:
+                if candidate_plan[truck_id] != current_plan.get(truck_id):
+                    record_truck_routes(risk_tracker, truck_id, truck_simulations[truck_id][1])
+
+            current_plan = candidate_plan
+            current_cost = candidate_cost
+
+            if current_cost < best_cost:
+                best_plan = copy_plan(current_plan)
+                best_cost = current_cost
+                best_risk = risk_tracker.get_summary()
+                best_iteration = iteration
+
+    return best_plan, best_cost
+
+
+# Space-Time Complexity: O(1)
+# Returns True if the deadline risk summary has no late Package and a minimum slack of at least early_stop_min_slack
+def is_risk_settled(risk_summary):
+    if risk_summary["late_count"] > 0:
+        return False
+    return risk_summary["min_slack"] is None or risk_summary["min_slack"] >= early_stop_min_slack
+
+
+# Helper function for optimize_plan_parallel, unpacks the arguments sent to a worker process
+def optimize_plan_worker(arguments):
+    problem, initial_plan, time_budget, seed, max_iterations = arguments
+    return optimize_plan(problem, initial_plan, time_budget, seed, max_iterations)
+
+
+# Runs optimize_plan with a different seed in each worker process and returns the best plan and its cost
+def optimize_plan_parallel(problem, initial_plan, time_budget=30, seeds=(1, 2, 3, 4), max_iterations=None):
+    arguments = [(problem, initial_plan, time_budget, seed, max_iterations) for seed in seeds]
+
+    with ProcessPoolExecutor(max_workers=len(arguments)) as executor:
+        results = list(executor.map(optimize_plan_worker, arguments))
+
+    return min(results, key=lambda result: result[1])
+
+
+if __name__ == "__main__":
+    import sys
+
+    from main import build_delivery_plan
+    from route_plan import apply_plan, build_routing_problem, extract_plan
+
+    # An optional time budget in seconds may be provided as the first command-line argument
+    budget = float(sys.argv[1]) if len(sys.argv) > 1 else 30
+
+    delivery_ht, truck_list = build_delivery_plan()
+    routing_problem = build_routing_problem(delivery_ht, truck_list)
+    greedy_plan = extract_plan(delivery_ht, truck_list)
+
+    optimized_plan, optimized_cost = optimize_plan_parallel(routing_problem, greedy_plan, budget)
+    greedy_simulation = simulate_plan(routing_problem, greedy_plan)
+    optimized_simulation = apply_plan(delivery_ht, truck_list, routing_problem, optimized_plan)
+
+    print("Greedy plan mileage: %0.2f miles" % greedy_simulation["total_mileage"])
+    print("Optimized plan mileage: %0.2f miles" % optimized_simulation["total_mileage"])
+    print("Late packages: %d" % optimized_simulation["late_packages"])
@@ -0,0 +1,426 @@
+import argparse
+import contextlib
+import inspect
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import timedelta
+
+# Optimizer time budget in seconds used by the 'optimize' option when no budget is given
+default_optimizer_budget = 10
+
+# Directory of this tool, the planner version that is compared by default
+tool_directory = os.path.dirname(os.path.abspath(__file__))
+
+
+# Space-Time Complexity: O(1)
+# Parses a planner configuration into the settings of main. A configuration is a comma separated list of options:
+# 'greedy', 'exact', 'optimize[=SECONDS]', 'seeds=SEED/SEED/...', 'speed=MPH' and 'service=MINUTES',
+# e.g. 'optimize=5,exact'. A ValueError naming the option is raised for an unknown option or an invalid value
+def parse_config(config_text):
+    settings = {}
+
+    for option in config_text.split(","):
+        name, separator, value = option.strip().partition("=")
+        try:
+            if name == "greedy" and not separator:
+                continue
+            elif name == "exact" and not separator:
+                settings["use_exact_routing"] = True
+            elif name == "optimize" and float(value or default_optimizer_budget) >= 0:
+                settings["optimizer_time_budget"] = float(value or default_optimizer_budget)
+            elif name == "seeds" and value:
+                settings["optimizer_seeds"] = tuple(int(seed) for seed in value.split("/"))
+            elif name == "speed" and value and float(value) > 0:
+                settings["speed"] = float(value)
+            elif name == "service" and value and float(value) >= 0:
+                settings["service_minutes"] = float(value)
+            else:
+                raise ValueError()
+        except ValueError:
+            raise ValueError("invalid planner option '%s' in '%s'" % (option.strip(), config_text))
+
+    return settings
+
+
+# Planner option and setting of main behind every parsed setting. A checkout of the planner without the setting of
+# main does not support the option
+required_main_settings = {
+    "use_exact_routing": ("exact", "use_exact_routing"),
+    "optimizer_time_budget": ("optimize", "optimizer_time_budget"),
+    "optimizer_seeds": ("seeds", "optimizer_seeds"),
+    "speed": ("speed", "travel_time_model"),
+    "service_minutes": ("service", "travel_time_model")
+}
+
+
+# Space-Time Complexity: O(1)
+# Changes the settings of main to match the planner configuration. A ValueError is raised if the planner does not
+# support one of the options, so that a plan is never labelled with options it was not planned with
+def apply_config(main_module, settings):
+    for setting_name in settings:
+        option_name, main_setting = required_main_settings[setting_name]
+        if not hasattr(main_module, main_setting):
+            raise ValueError("the planner in %s does not support the '%s' option (main.%s is missing)" %
+                             (os.getcwd(), option_name, main_setting))
+
+    if "use_exact_routing" in settings:
+        main_module.use_exact_routing = settings["use_exact_routing"]
+    if "optimizer_time_budget" in settings:
+        main_module.optimizer_time_budget = settings["optimizer_time_budget"]
+    if "optimizer_seeds" in settings:
+        main_module.optimizer_seeds = settings["optimizer_seeds"]
+    if "speed" in settings or "service_minutes" in settings:
+        from TravelTimeModel import TravelTimeModel, average_truck_speed
+
+        main_module.travel_time_model = TravelTimeModel(
+            default_speed=settings.get("speed", average_truck_speed),
+            service_time=timedelta(minutes=settings.get("service_minutes", 0)))
+
+
+# Space-Time Complexity: O(1)
+# Converts a timedelta to seconds, keeping None for a missing time
+def to_seconds(time_delta):
+    if time_delta is None:
+        return None
+    return time_delta.total_seconds()
+
+
+# Plans the day with the planner configuration and returns a summary that can be written as JSON: the mileage,
+# capacity and return time of every Truck, and the Truck, departure, delivery, deadline, arrival at the hub,
+# required Truck and special notes of every Package (times in seconds since midnight), along with the seconds spent
+# in every planning phase. Only the planner's own data is read, so that any version of the planner can be run. The
+# violations and the score are computed from the summary by this tool
+def run_planner(config_text):
+    import main
+
+    apply_config(main, parse_config(config_text))
+
+    # Planner versions that do not record their phases only report the total planning time
+    phase_times = {}
+    start = time.perf_counter()
+    if "phase_times" in inspect.signature(main.build_delivery_plan).parameters:
+        delivery_ht, truck_list = main.build_delivery_plan(phase_times)
+    else:
+        delivery_ht, truck_list = main.build_delivery_plan()
+    phase_times["total"] = time.perf_counter() - start
+
+    packages = {}
+    for package in delivery_ht.package_table:
+        if package is not None:
+            packages[str(package.id_number)] = {
+                "truck": package.assigned_truck_id,
+                "en_route": to_seconds(package.en_route_timestamp),
+                "delivered": to_seconds(package.delivery_timestamp),
+                "deadline": to_seconds(package.get_delivery_deadline_timedelta()),
+                "available": to_seconds(package.get_delayed_arrival_time()),
+                "required_truck": package.get_required_truck_id(),
+                "notes": package.special_notes
+            }
+
+    trucks = {}
+    for truck in truck_list:
+        mileage, back_at_hub = truck.mileage_timestamps[-1]
+        trucks[str(truck.id)] = {"mileage": mileage, "capacity": truck.capacity, "back_at_hub": to_seconds(back_at_hub)}
+
+    return {"config": config_text, "trucks": trucks, "packages": packages, "phase_seconds": phase_times}
+
+
+# Space-Time Complexity: O(N^2)
+# Returns the lists of Package IDs that must be delivered together. The special notes 'Must be delivered with ...'
+# link Packages, and every set of linked Packages is a group
+def get_delivery_groups(summary):
+    groups = []
+
+    for package_id, package in sorted(summary["packages"].items(), key=lambda item: int(item[0])):
+        if "Must be delivered with" not in package["notes"]:
+            continue
+
+        linked_ids = [int(package_id)]
+        linked_ids.extend(int(token) for token in package["notes"].replace(",", " ").split()
+                          if token.isdigit() and token in summary["packages"])
+
+        # Merge every group that shares a Package with the linked Packages
+        merged_group = []
+        for group in [group for group in groups if any(linked_id in group for linked_id in linked_ids)]:
+            groups.remove(group)
+            merged_group.extend(group)
+        merged_group.extend(linked_id for linked_id in linked_ids if linked_id not in merged_group)
+        groups.append(merged_group)
+
+    return groups
+
+
+# Space-Time Complexity: O(N^2)
+# Returns every constraint broken by the plan of the summary: capacity, required Truck, co-delivery groups, Packages
+# never delivered, and Packages that leave the hub before they arrive there. A trip is the Packages that left the
+# hub on the same Truck at the same time
+def find_violations(summary):
+    violations = []
+    trips = {}
+
+    for package_id, package in sorted(summary["packages"].items(), key=lambda item: int(item[0])):
+        if package["delivered"] is None:
+            violations.append("Package %s is never delivered" % package_id)
+            continue
+        trips.setdefault(package["truck"], {}).setdefault(package["en_route"], []).append(int(package_id))
+
+        if package["required_truck"] is not None and package["required_truck"] != package["truck"]:
+            violations.append("Package %s can only be on truck %d" % (package_id, package["required_truck"]))
+        if (package["available"] is not None and package["en_route"] is not None and
+                package["en_route"] < package["available"]):
+            violations.append("Package %s leaves the hub before it arrives" % package_id)
+
+    for truck_id in sorted(trips, key=str):
+        truck = summary["trucks"].get(str(truck_id))
+        departures = sorted(trips[truck_id], key=lambda departure: (departure is not None, departure))
+        for trip_index, departure in enumerate(departures):
+            trip = trips[truck_id][departure]
+            if truck is not None and len(trip) > truck["capacity"]:
+                violations.append("Truck %s trip %d carries %d packages, capacity is %d" %
+                                  (truck_id, trip_index + 1, len(trip), truck["capacity"]))
+
+    # Packages that must be delivered together must share the same Truck and the same delivery trip
+    for group in get_delivery_groups(summary):
+        group_packages = [summary["packages"][str(package_id)] for package_id in group]
+        group_trips = set((package["truck"], package["en_route"]) for package in group_packages)
+        if len(group_trips) > 1:
+            violations.append("Packages %s are not delivered together" % ", ".join(str(i) for i in sorted(group)))
+
+    return violations
+
+
+# Runs the planner found in the source directory in a separate process, so that every side starts from a fresh
+# interpreter and the two planner versions never share modules or settings. Returns the summary of the plan along
+# with its violations and its score. A ValueError is raised if the planner does not support the configuration
+def run_planner_process(config_text, source_directory):
+    from plan_scoring import score_summary
+
+    source_directory = os.path.abspath(source_directory)
+    command = [sys.executable, os.path.abspath(__file__), "run", config_text, "--source", source_directory]
+
+    result = subprocess.run(command, cwd=source_directory, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                            universal_newlines=True)
+    if result.returncode == 2:
+        raise ValueError(result.stderr.strip().splitlines()[-1])
+    if result.returncode != 0:
+        raise RuntimeError("planner '%s' in %s failed:\n%s" % (config_text, source_directory, result.stderr))
+
+    summary = json.loads(result.stdout)
+    summary["source"] = source_directory
+    summary["violations"] = find_violations(summary)
+    summary["score"] = score_summary(summary)
+    return summary
+
+
+# Space-Time Complexity: O(1)
+# Returns the clock time [HOUR:MINUTE:SECOND] of a number of seconds since midnight, or None for a missing time
+def format_seconds(seconds):
+    if seconds is None:
+        return None
+    seconds = int(round(seconds))
+    return "%02d:%02d:%02d" % (seconds // 3600, seconds // 60 % 60, seconds % 60)
+
+
+# Space-Time Complexity: O(1)
+# Returns the baseline value, the candidate value and the change between them. A value missing on one side is None
+# and so is the change. Adding 0.0 turns a rounded -0.0 into 0.0
+def compare_values(baseline_value, candidate_value):
+    if baseline_value is None or candidate_value is None:
+        return {
+            "baseline": round(baseline_value, 3) if baseline_value is not None else None,
+            "candidate": round(candidate_value, 3) if candidate_value is not None else None,
+            "delta": None
+        }
+
+    return {
+        "baseline": round(baseline_value, 3),
+        "candidate": round(candidate_value, 3),
+        "delta": round(candidate_value - baseline_value, 3) + 0.0
+    }
+
+
+# Space-Time Complexity: O(N)
+# Returns the IDs of the Packages delivered after their deadline or never delivered
+def get_late_packages(summary):
+    late_packages = []
+    for package_id, package in summary["packages"].items():
+        if package["delivered"] is None or (package["deadline"] is not None and package["delivered"] >
+                                            package["deadline"]):
+            late_packages.append(int(package_id))
+    return sorted(late_packages)
+
+
+# Space-Time Complexity: O(N)
+# Compares the summaries of two plans: total and per-Truck mileage, the delivery time of every Package that changed
+# Truck or delivery time, late Packages, the score of the plan, constraint violations and the runtime of every
+# planning phase. A phase that only one side runs is None on the other side
+def diff_summaries(baseline, candidate):
+    baseline_mileage = {truck_id: truck["mileage"] for truck_id, truck in baseline["trucks"].items()}
+    candidate_mileage = {truck_id: truck["mileage"] for truck_id, truck in candidate["trucks"].items()}
+
+    truck_ids = sorted(set(baseline_mileage) | set(candidate_mileage), key=int)
+    trucks = {truck_id: compare_values(baseline_mileage.get(truck_id, 0), candidate_mileage.get(truck_id, 0))
+              for truck_id in truck_ids}
+
+    changed_packages = []
+    for package_id in sorted(set(baseline["packages"]) | set(candidate["packages"]), key=int):
+        baseline_package = baseline["packages"].get(package_id, {})
+        candidate_package = candidate["packages"].get(package_id, {})
+        baseline_delivery = baseline_package.get("delivered")
+        candidate_delivery = candidate_package.get("delivered")
+
+        delay_minutes = None
+        if baseline_delivery is not None and candidate_delivery is not None:
+            delay_minutes = round((candidate_delivery - baseline_delivery) / 60, 2)
+
+        if delay_minutes != 0 or baseline_package.get("truck") != candidate_package.get("truck"):
+            changed_packages.append({
+                "id": int(package_id),
+                "baseline_truck": baseline_package.get("truck"),
+                "candidate_truck": candidate_package.get("truck"),
+                "baseline_delivery": format_seconds(baseline_delivery),
+                "candidate_delivery": format_seconds(candidate_delivery),
+                "delay_minutes": delay_minutes
+            })
+
+    delays = [package["delay_minutes"] for package in changed_packages if package["delay_minutes"] is not None]
+    phase_names = list(baseline["phase_seconds"])
+    phase_names.extend(phase_name for phase_name in candidate["phase_seconds"] if phase_name not in phase_names)
+
+    return {
+        "baseline": {"config": baseline["config"], "source": baseline.get("source")},
+        "candidate": {"config": candidate["config"], "source": candidate.get("source")},
+        "total_mileage": compare_values(sum(baseline_mileage.values()), sum(candidate_mileage.values())),
+        "trucks": trucks,
+        "packages": {
+            "changed": len(changed_packages),
+            "max_delay_minutes": max(delays + [0]),
+            "max_gain_minutes": -min(delays + [0]),
+            "deltas": changed_packages
+        },
+        "late_packages": {"baseline": get_late_packages(baseline), "candidate": get_late_packages(candidate)},
+        "score": {objective: compare_values(baseline["score"][objective], candidate["score"][objective])
+                  for objective in baseline["score"] if objective != "trips_per_truck"},
+        "violations": {"baseline": baseline["violations"], "candidate": candidate["violations"]},
+        "phase_seconds": {phase_name: compare_values(baseline["phase_seconds"].get(phase_name),
+                                                     candidate["phase_seconds"].get(phase_name))
+                          for phase_name in phase_names}
+    }
+
+
+# Space-Time Complexity: O(N)
+# Returns a message for every threshold that the candidate plan exceeds. Thresholds that are None are not checked
+def check_thresholds(report, max_mileage_increase=None, max_late_increase=None, max_delivery_delay=None,
+                     max_runtime_ratio=None, allow_new_violations=False):
+    failures = []
+
+    mileage_increase = report["total_mileage"]["delta"]
+    if max_mileage_increase is not None and mileage_increase > max_mileage_increase:
+        failures.append("Total mileage increased by %0.2f miles, the limit is %0.2f miles" %
+                        (mileage_increase, max_mileage_increase))
+
+    late_increase = len(report["late_packages"]["candidate"]) - len(report["late_packages"]["baseline"])
+    if max_late_increase is not None and late_increase > max_late_increase:
+        failures.append("%d more late packages, the limit is %d" % (late_increase, max_late_increase))
+
+    delivery_delay = report["packages"]["max_delay_minutes"]
+    if max_delivery_delay is not None and delivery_delay > max_delivery_delay:
+        failures.append("A package is delivered %0.2f minutes later, the limit is %0.2f minutes" %
+                        (delivery_delay, max_delivery_delay))
+
+    total_runtime = report["phase_seconds"].get("total")
+    if max_runtime_ratio is not None and total_runtime is not None and total_runtime["baseline"] > 0:
+        runtime_ratio = total_runtime["candidate"] / total_runtime["baseline"]
+        if runtime_ratio > max_runtime_ratio:
+            failures.append("Planning took %0.2fx as long, the limit is %0.2fx" % (runtime_ratio, max_runtime_ratio))
+
+    new_violations = [violation for violation in report["violations"]["candidate"]
+                      if violation not in report["violations"]["baseline"]]
+    if not allow_new_violations:
+        failures.extend("New violation: " + violation for violation in new_violations)
+
+    return failures
+
+
+# Space-Time Complexity: O(1)
+# Builds the command line parser. The 'run' command is used internally to plan one side in its own process
+def build_argument_parser():
+    parser = argparse.ArgumentParser(description="Compare the plans of two planner versions or configurations")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    compare_parser = subparsers.add_parser("compare", help="plan both sides and write the differences as JSON")
+    compare_parser.add_argument("baseline", help="configuration, e.g. 'greedy' or 'optimize=5,exact'")
+    compare_parser.add_argument("candidate", help="configuration, e.g. 'greedy' or 'optimize=5,exact'")
+    compare_parser.add_argument("--baseline-source", default=tool_directory, metavar="DIRECTORY",
+                                help="checkout of the baseline planner version")
+    compare_parser.add_argument("--candidate-source", default=tool_directory, metavar="DIRECTORY",
+                                help="checkout of the candidate planner version")
+    compare_parser.add_argument("--output", metavar="PATH", help="write the report to a file instead of stdout")
+    compare_parser.add_argument("--max-mileage-increase", type=float, metavar="MILES")
+    compare_parser.add_argument("--max-late-increase", type=int, metavar="PACKAGES")
+    compare_parser.add_argument("--max-delivery-delay", type=float, metavar="MINUTES",
+                                help="largest delay of any single package")
+    compare_parser.add_argument("--max-runtime-ratio", type=float, metavar="RATIO",
+                                help="candidate planning time divided by baseline planning time")
+    compare_parser.add_argument("--allow-new-violations", action="store_true")
+
+    run_parser = subparsers.add_parser("run", help="plan one side and write its summary as JSON")
+    run_parser.add_argument("config")
+    run_parser.add_argument("--source", default=tool_directory, metavar="DIRECTORY")
+
+    return parser
+
+
+def main(argv=None):
+    parser = build_argument_parser()
+    arguments = parser.parse_args(argv)
+
+    if arguments.command == "run":
+        # Import the planner from the source directory instead of the directory of this tool
+        sys.path.insert(0, os.path.abspath(arguments.source))
+        os.chdir(arguments.source)
+
+        # Anything the planner prints goes to stderr so that stdout only holds the summary. A configuration that
+        # the planner does not support exits with status 2 and the reason, rather than a traceback
+        try:
+            with contextlib.redirect_stdout(sys.stderr):
+                summary = run_planner(arguments.config)
+        except ValueError as error:
+            sys.stderr.write(str(error) + "\n")
+            return 2
+        json.dump(summary, sys.stdout)
+        return 0
+
+    # Both configurations are checked before any planner is started
+    for config_text in (arguments.baseline, arguments.candidate):
+        try:
+            parse_config(config_text)
+        except ValueError as error:
+            parser.error(str(error))
+
+    try:
+        baseline = run_planner_process(arguments.baseline, arguments.baseline_source)
+        candidate = run_planner_process(arguments.candidate, arguments.candidate_source)
+    except ValueError as error:
+        parser.error(str(error))
+
+    report = diff_summaries(baseline, candidate)
+    report["failures"] = check_thresholds(report, arguments.max_mileage_increase, arguments.max_late_increase,
+                                          arguments.max_delivery_delay, arguments.max_runtime_ratio,
+                                          arguments.allow_new_violations)
+
+    report_text = json.dumps(report, indent=2)
+    if arguments.output is not None:
+        with open(arguments.output, "w") as report_file:
+            report_file.write(report_text + "\n")
+    else:
+        print(report_text)
+
+    return 1 if len(report["failures"]) > 0 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,177 @@
+import argparse
+import csv
+import json
+import sys
+from datetime import timedelta
+
+# Start of the working day, the reference point of the makespan. The tool scores plans of any planner version, so it
+# keeps its own copy instead of importing the planner's
+start_of_day = timedelta(hours=8)
+
+# Objectives compared by the Pareto front. Every objective is minimized
+default_objectives = ("mileage", "makespan_hours", "late_minutes", "driver_hours")
+
+# Columns of the exported table
+score_columns = ("config", "mileage", "makespan_hours", "late_packages", "late_minutes", "trips", "trips_per_truck",
+                 "driver_hours", "on_front")
+
+
+# Space-Time Complexity: O(N + T)
+# Scores the plan of a planner summary (see plan_diff.run_planner). The Packages are read once for the lateness and
+# the trips, each trip being the Packages that left the hub on the same Truck at the same time. Returns the mileage,
+# the makespan (from the start of the day until the last Truck is back at the hub), the number of late Packages and
+# minutes of lateness, the number of trips of every Truck and the driver-hours (from each Truck's first departure
+# until it is back at the hub). Only the summary is read, so plans of any planner version are scored the same way
+def score_summary(summary):
+    late_packages = 0
+    lateness = 0
+    trip_departures = {truck_id: set() for truck_id in summary["trucks"]}
+
+    for package in summary["packages"].values():
+        if package["delivered"] is None:
+            continue
+
+        if package["deadline"] is not None and package["delivered"] > package["deadline"]:
+            late_packages += 1
+            lateness += package["delivered"] - package["deadline"]
+
+        trip_departures.setdefault(str(package["truck"]), set()).add(package["en_route"])
+
+    mileage = 0
+    end_of_day = start_of_day.total_seconds()
+    driver_seconds = 0
+
+    for truck_id, truck in summary["trucks"].items():
+        mileage += truck["mileage"]
+
+        if len(trip_departures[truck_id]) > 0:
+            end_of_day = max(end_of_day, truck["back_at_hub"])
+            driver_seconds += truck["back_at_hub"] - min(trip_departures[truck_id])
+
+    return {
+        "mileage": round(mileage, 2),
+        "makespan_hours": round((end_of_day - start_of_day.total_seconds()) / 3600, 3),
+        "late_packages": late_packages,
+        "late_minutes": round(lateness / 60, 2),
+        "trips": sum(len(departures) for departures in trip_departures.values()),
+        "trips_per_truck": {truck_id: len(departures)
+                            for truck_id, departures in sorted(trip_departures.items(), key=lambda item: int(item[0]))},
+        "driver_hours": round(driver_seconds / 3600, 3)
+    }
+
+
+# Space-Time Complexity: O(K) where K is the number of objectives
+# Returns True if score A is at least as good as score B on every objective and better on at least one
+def dominates(score_a, score_b, objectives=default_objectives):
+    better_on_one = False
+    for objective in objectives:
+        if score_a[objective] > score_b[objective]:
+            return False
+        if score_a[objective] < score_b[objective]:
+            better_on_one = True
+    return better_on_one
+
+
+# Space-Time Complexity: O(F * K) where F is the size of the front
+# Adds the scored plan to the Pareto front unless a plan on the front dominates it, and drops the plans that it
+# dominates. Returns True if the plan is on the front
+def update_pareto_front(front, entry, objectives=default_objectives):
+    for front_entry in front:
+        if dominates(front_entry["score"], entry["score"], objectives):
+            return False
+
+    front[:] = [front_entry for front_entry in front if not dominates(entry["score"], front_entry["score"],
+                                                                        objectives)]
+    front.append(entry)
+    return True
+
+
+# Space-Time Complexity: O(P * F * K) where P is the number of plans
+# Scores every planner configuration and returns the scored plans in the order they were run, each marked with
+# whether it is on the Pareto front, along with the Pareto front
+def score_configs(config_texts, source_directory, objectives=default_objectives):
+    from plan_diff import run_planner_process
+
+    entries = []
+    front = []
+    for config_text in config_texts:
+        summary = run_planner_process(config_text, source_directory)
+        entry = {"config": config_text, "score": summary["score"]}
+        entries.append(entry)
+        update_pareto_front(front, entry, objectives)
+
+    for entry in entries:
+        entry["on_front"] = any(entry is front_entry for front_entry in front)
+    return entries, front
+
+
+# Space-Time Complexity: O(1)
+# Returns the row of the exported table for a scored plan
+def format_score_row(entry):
+    row = dict(entry["score"], config=entry["config"], on_front=entry["on_front"])
+    row["trips_per_truck"] = " ".join("%s:%d" % trip_count for trip_count in row["trips_per_truck"].items())
+    return row
+
+
+# Space-Time Complexity: O(P)
+# Writes every scored plan to a CSV file, one row per plan
+def export_csv(path, entries):
+    with open(path, "w", newline="") as csv_file:
+        csv_writer = csv.DictWriter(csv_file, fieldnames=score_columns)
+        csv_writer.writeheader()
+        for entry in entries:
+            csv_writer.writerow(format_score_row(entry))
+
+
+# Space-Time Complexity: O(P)
+# Writes the objectives, every scored plan and the Pareto front to a JSON file
+def export_json(path, entries, front, objectives=default_objectives):
+    with open(path, "w") as json_file:
+        json.dump({"objectives": list(objectives), "plans": entries,
+                   "front": [entry["config"] for entry in front]}, json_file, indent=2)
+        json_file.write("\n")
+
+
+# Space-Time Complexity: O(P)
+# Prints every scored plan, marking the plans on the Pareto front with '*'
+def print_scores(entries):
+    print("  %-24s %9s %9s %5s %9s %6s %9s" % ("Configuration", "Miles", "Makespan", "Late", "Late min", "Trips",
+                                              "Driver h"))
+    for entry in entries:
+        score = entry["score"]
+        print("%s %-24s %9.2f %9.3f %5d %9.2f %6d %9.3f" % (
+            "*" if entry["on_front"] else " ", entry["config"], score["mileage"], score["makespan_hours"],
+            score["late_packages"], score["late_minutes"], score["trips"], score["driver_hours"]))
+
+
+def main(argv=None):
+    from plan_diff import tool_directory
+
+    parser = argparse.ArgumentParser(description="Score planner configurations and export their Pareto front")
+    parser.add_argument("configs", nargs="+", help="configurations, e.g. 'greedy' 'exact' 'optimize=5,exact'")
+    parser.add_argument("--source", default=tool_directory, metavar="DIRECTORY",
+                        help="checkout of the planner version")
+    parser.add_argument("--objectives", default=",".join(default_objectives),
+                        help="comma separated objectives of the Pareto front, from: " +
+                             ", ".join(column for column in score_columns[1:-1] if column != "trips_per_truck"))
+    parser.add_argument("--csv", metavar="PATH", help="export every scored plan as CSV")
+    parser.add_argument("--json", metavar="PATH", help="export every scored plan and the Pareto front as JSON")
+    arguments = parser.parse_args(argv)
+
+    objectives = tuple(objective.strip() for objective in arguments.objectives.split(","))
+    for objective in objectives:
+        if objective not in score_columns[1:-1] or objective == "trips_per_truck":
+            parser.error("unknown objective '%s'" % objective)
+
+    entries, front = score_configs(arguments.configs, arguments.source, objectives)
+
+    print_scores(entries)
+    if arguments.csv is not None:
+        export_csv(arguments.csv, entries)
+    if arguments.json is not None:
+        export_json(arguments.json, entries, front, objectives)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
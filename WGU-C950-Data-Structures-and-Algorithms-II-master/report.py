@@ -0,0 +1,131 @@
+import sys
+from datetime import timedelta
+from itertools import islice
+
+# A Package is at risk when it is delivered later than this margin before its deadline
+deadline_risk_margin = timedelta(minutes=15)
+
+# Number of rows shown on a single page of the report
+default_page_size = 50
+
+# Positions of the values stored in each entry of the timeline index
+entry_id = 0
+entry_en_route = 1
+entry_delivery = 2
+entry_truck = 3
+entry_deadline = 4
+entry_details = 5
+
+# Keys that the report can be sorted by
+sort_keys = {
+    "id": lambda entry: entry[entry_id],
+    "delivery": lambda entry: (entry[entry_delivery] is None, entry[entry_delivery], entry[entry_id]),
+    "deadline": lambda entry: (entry[entry_deadline] is None, entry[entry_deadline], entry[entry_id]),
+    "truck": lambda entry: (entry[entry_truck] is None, entry[entry_truck], entry[entry_id])
+}
+
+
+# Space-Time Complexity: O(1)
+# Formats a timedelta since midnight in the format [HOUR:MINUTE AM/PM] without converting it to a datetime
+def format_clock_time(time_delta):
+    total_minutes = int(time_delta.total_seconds()) // 60
+    hour = (total_minutes // 60) % 24
+    minute = total_minutes % 60
+    return "%02d:%02d %s" % (hour % 12 or 12, minute, "AM" if hour < 12 else "PM")
+
+
+# Space-Time Complexity: O(1)
+# Builds the entry of the Package in the timeline index: the timestamps needed to compute the status and the
+# preformatted delivery information that does not change over time
+def build_timeline_entry(package):
+    details = ("\tAddress: " + package.delivery_address + "\tCity: " + package.delivery_city +
+               "\tZIP Code: " + package.delivery_zip + "\tPackage Weight: " + package.package_mass +
+               " kilograms\tDelivery Deadline: " + package.delivery_deadline + "\n")
+    return (package.id_number, package.en_route_timestamp, package.delivery_timestamp, package.assigned_truck_id,
+            package.get_delivery_deadline_timedelta(), details)
+
+
+# Space-Time Complexity: O(N log N)
+# Builds the timeline index of the report: one entry per Package, ordered by Package ID
+def build_timeline_index(ht):
+    index = [build_timeline_entry(package) for package in ht.package_table if package is not None]
+    index.sort(key=sort_keys["id"])
+    return index
+
+
+# Space-Time Complexity: O(1)
+# Returns the delivery status of the entry at the specified time
+def get_entry_status(entry, report_timedelta):
+    if entry[entry_en_route] > report_timedelta:
+        return "At the hub"
+    elif entry[entry_delivery] > report_timedelta:
+        return "En route"
+    return "Delivered"
+
+
+# Space-Time Complexity: O(1)
+# Returns True if the Package of the entry is delivered late or close to its deadline
+def is_deadline_at_risk(entry):
+    return entry[entry_deadline] is not None and entry[entry_delivery] > entry[entry_deadline] - deadline_risk_margin
+
+
+# Space-Time Complexity: O(1)
+# Formats a single row of the report in the same layout as the Package Query
+def format_report_row(entry, delivery_status):
+    row = "[Package ID = %d] " % entry[entry_id]
+
+    if delivery_status == "At the hub":
+        row += "\tDelivery Status: At the hub"
+    elif delivery_status == "En route":
+        row += "\tDelivery Status: En route to delivery address, expected delivery at " + format_clock_time(
+            entry[entry_delivery])
+    else:
+        row += "\tDelivery Status: Delivered at " + format_clock_time(entry[entry_delivery])
+
+    return row + entry[entry_details]
+
+
+# Space-Time Complexity: O(N log N) when sorted by anything other than the Package ID, O(N) otherwise
+# Generator of the formatted report rows at the specified time. Rows can be filtered by delivery status, by Truck
+# and to only the Packages whose deadline is at risk. Rows are only formatted when they are consumed, so a single
+# page of a large report only formats the rows on that page
+def iter_report_rows(index, report_timedelta, status=None, truck_id=None, deadline_at_risk=False, sort_by="id"):
+    entries = index
+    if truck_id is not None:
+        entries = [entry for entry in entries if entry[entry_truck] == truck_id]
+    if deadline_at_risk:
+        entries = [entry for entry in entries if is_deadline_at_risk(entry)]
+    if sort_by != "id":
+        entries = sorted(entries, key=sort_keys[sort_by])
+
+    for entry in entries:
+        delivery_status = get_entry_status(entry, report_timedelta)
+        if status is None or delivery_status == status:
+            yield format_report_row(entry, delivery_status)
+
+
+# Space-Time Complexity: O(P) where P is the page size
+# Returns the rows on the specified page. Pages are numbered starting from 1
+def get_report_page(rows, page, page_size=default_page_size):
+    start = (page - 1) * page_size
+    return islice(rows, start, start + page_size)
+
+
+# Space-Time Complexity: O(N)
+# Writes the title and all the rows of the report with a single write
+def write_report(report_timedelta, rows, output=None):
+    if output is None:
+        output = sys.stdout
+
+    title = ("=========================================\n" +
+             "Status report of all packages at " + format_clock_time(report_timedelta) + "\n" +
+             "=========================================\n")
+    output.write(title + "".join(rows))
+    output.flush()
+
+
+if __name__ == "__main__":
+    from cli import main
+
+    # The report is available as the 'report' command of the command line interface
+    sys.exit(main(["report"] + sys.argv[1:]))
@@ -0,0 +1,328 @@
+from datetime import timedelta
+
+from main import address_corrections, get_input_data, get_lists_associated_packages
+from TravelTimeModel import TravelTimeModel
+
+# Time at which the Packages are available at the hub unless they are delayed
+start_of_day = timedelta(hours=8)
+
+
+# A routing problem is a dictionary built once from the HashTable and the Trucks. It only contains plain values so
+# it can be copied to other processes:
+#   "distances"       2D list of distances between address indexes
+#   "hub_index"       index of the hub address
+#   "packages"        {package_id: {"address_index", "available", "deadline", "required_truck"}}
+#   "trucks"          {truck_id: {"start_time", "capacity"}}
+#   "groups"          list of Package ID lists that must be delivered on the same Truck and same delivery trip
+#   "travel_model"    TravelTimeModel that provides the driving and service times
+#
+# A plan is a dictionary {truck_id: [trip, trip, ...]} where each trip is a list of Package IDs in delivery order.
+# Every trip departs from the hub and returns to the hub.
+
+
+# Space-Time Complexity: O(N^2)
+# Builds the routing problem from the Packages in the HashTable and the list of Trucks. Travel times come from the
+# provided TravelTimeModel, or from a constant average speed with no service time when none is provided
+def build_routing_problem(ht, truck_list, travel_model=None):
+    input_data = get_input_data()
+    address_index = input_data["address_index"]
+
+    # Parse the special notes of every Package into plain values
+    packages = {}
+    for package in ht.package_table:
+        if package is not None:
+            available = package.get_delayed_arrival_time()
+            packages[package.id_number] = {
+                "address_index": address_index[package.delivery_address],
+                "available": available if available is not None else start_of_day,
+                "deadline": package.get_delivery_deadline_timedelta(),
+                "required_truck": package.get_required_truck_id()
+            }
+
+    # A Truck starts its day when its first delivery trip departs, or at its current time if it has not left yet
+    trucks = {}
+    for truck in truck_list:
+        departures = [package.en_route_timestamp for package in ht.package_table
+                      if package is not None and package.assigned_truck_id == truck.id
+                      and package.en_route_timestamp is not None]
+        trucks[truck.id] = {
+            "start_time": min(departures) if len(departures) > 0 else truck.time_obj,
+            "capacity": truck.capacity
+        }
+
+    groups = [[package.id_number for package in group] for group in get_lists_associated_packages(ht)]
+
+    return {
+        "distances": input_data["distances"],
+        "hub_index": address_index[truck_list[0].hub_address],
+        "packages": packages,
+        "trucks": trucks,
+        "groups": groups,
+        "travel_model": travel_model if travel_model is not None else TravelTimeModel()
+    }
+
+
+# Space-Time Complexity: O(N log N)
+# Returns the plan that was simulated into the HashTable. Packages loaded at the same time onto the same Truck
+# belong to the same trip, and each trip is ordered by delivery time
+def extract_plan(ht, truck_list):
+    plan = {truck.id: [] for truck in truck_list}
+    trips = {}
+
+    for package in ht.package_table:
+        if package is not None and package.assigned_truck_id is not None and package.en_route_timestamp is not None:
+            trips.setdefault((package.assigned_truck_id, package.en_route_timestamp), []).append(package)
+
+    for truck_id, departure in sorted(trips):
+        trip = sorted(trips[(truck_id, departure)], key=lambda package: package.delivery_timestamp)
+        plan[truck_id].append([package.id_number for package in trip])
+
+    return plan
+
+
+# Space-Time Complexity: O(N)
+# Returns a copy of the plan that can be modified without changing the original plan
+def copy_plan(plan):
+    return {truck_id: [list(trip) for trip in trips] for truck_id, trips in plan.items()}
+
+
+# Space-Time Complexity: O(N)
+# Simulates every delivery trip of a single Truck. Returns a dictionary containing the mileage of the Truck, the
+# delivery time of every Package it delivers, the deadline lateness, the timeline of the Truck and the projected
+# arrivals of every trip as (trip_index, [(package_id, arrival), ...]) pairs
+def simulate_truck(problem, truck_id, trips):
+    distances = problem["distances"]
+    hub_index = problem["hub_index"]
+    packages = problem["packages"]
+    travel_model = problem["travel_model"]
+
+    delivery_times = {}
+    departure_times = {}
+    trip_arrivals = []
+    total_lateness = timedelta(0)
+    late_packages = 0
+
+    current_time = problem["trucks"][truck_id]["start_time"]
+    mileage = 0
+    service_time = travel_model.get_service_time(truck_id)
+
+    # The timeline is a list of [mileage, timestamp] pairs, starting at the hub
+    timeline = [[0.0, current_time]]
+
+    for trip_index, trip in enumerate(trips):
+        if len(trip) == 0:
+            continue
+
+        # The trip cannot depart before every Package loaded onto the Truck has arrived at the hub
+        for package_id in trip:
+            if packages[package_id]["available"] > current_time:
+                current_time = packages[package_id]["available"]
+        departure_time = current_time
+
+        current_index = hub_index
+        for package_id in trip:
+            package = packages[package_id]
+
+            # Packages going to the same address are all delivered during a single stop
+            if package["address_index"] != current_index:
+                # The Truck leaves the previous stop once its Packages are handed over
+                if current_index != hub_index:
+                    current_time = current_time + service_time
+
+                distance = distances[current_index][package["address_index"]]
+                mileage += distance
+                current_time = current_time + travel_model.travel_time(truck_id, current_time, distance)
+                current_index = package["address_index"]
+
+            delivery_times[package_id] = current_time
+            departure_times[package_id] = departure_time
+            timeline.append([mileage, current_time])
+
+            # Track how late the Package was delivered compared to its deadline
+            if package["deadline"] is not None and current_time > package["deadline"]:
+                late_packages += 1
+                total_lateness += current_time - package["deadline"]
+
+        trip_arrivals.append((trip_index, [(package_id, delivery_times[package_id]) for package_id in trip]))
+
+        # After delivering all Packages on the trip, the Truck returns to the hub
+        if current_index != hub_index:
+            current_time = current_time + service_time
+        distance = distances[current_index][hub_index]
+        mileage += distance
+        current_time = current_time + travel_model.travel_time(truck_id, current_time, distance)
+        timeline.append([mileage, current_time])
+
+    return {
+        "mileage": mileage,
+        "delivery_times": delivery_times,
+        "departure_times": departure_times,
+        "late_packages": late_packages,
+        "total_lateness": total_lateness,
+        "timeline": timeline,
+        "trip_arrivals": trip_arrivals
+    }
+
+
+# Space-Time Complexity: O(R log N) where R is the number of Packages delivered by the Truck
+# Records the projected arrivals of every trip of the simulated Truck in the DeadlineRiskTracker. Each trip is a
+# route keyed by (truck_id, trip_index), and trips of the Truck that no longer exist stop being tracked
+def record_truck_routes(risk_tracker, truck_id, truck_simulation):
+    simulated_routes = set()
+    for trip_index, arrivals in truck_simulation["trip_arrivals"]:
+        route_key = (truck_id, trip_index)
+        risk_tracker.update_route(route_key, arrivals)
+        simulated_routes.add(route_key)
+
+    for route_key in risk_tracker.get_route_keys():
+        if route_key[0] == truck_id and route_key not in simulated_routes:
+            risk_tracker.remove_route(route_key)
+
+
+# Space-Time Complexity: O(N)
+# Simulates every delivery trip of the plan. Returns a dictionary containing the total mileage, the delivery time
+# of every Package, the deadline lateness and the timeline of every Truck. When a DeadlineRiskTracker is provided,
+# the projected arrivals of every trip are recorded in it and trips that no longer exist stop being tracked. When a
+# dictionary of Truck simulations is provided, a Truck whose trips are unchanged since its last simulation is not
+# simulated again
+def simulate_plan(problem, plan, risk_tracker=None, truck_simulations=None):
+    delivery_times = {}
+    departure_times = {}
+    truck_timelines = {}
+    total_mileage = 0
+    total_lateness = timedelta(0)
+    late_packages = 0
+
+    for truck_id, trips in plan.items():
+        cached_simulation = truck_simulations.get(truck_id) if truck_simulations is not None else None
+        if cached_simulation is not None and cached_simulation[0] == trips:
+            truck_simulation = cached_simulation[1]
+        else:
+            truck_simulation = simulate_truck(problem, truck_id, trips)
+            if truck_simulations is not None:
+                truck_simulations[truck_id] = ([list(trip) for trip in trips], truck_simulation)
+
+        if risk_tracker is not None:
+            record_truck_routes(risk_tracker, truck_id, truck_simulation)
+
+        delivery_times.update(truck_simulation["delivery_times"])
+        departure_times.update(truck_simulation["departure_times"])
+        truck_timelines[truck_id] = truck_simulation["timeline"]
+        total_mileage += truck_simulation["mileage"]
+        total_lateness += truck_simulation["total_lateness"]
+        late_packages += truck_simulation["late_packages"]
+
+    # Trucks that are not part of the plan stop being tracked
+    if risk_tracker is not None:
+        for route_key in risk_tracker.get_route_keys():
+            if route_key[0] not in plan:
+                risk_tracker.remove_route(route_key)
+
+    return {
+        "total_mileage": total_mileage,
+        "delivery_times": delivery_times,
+        "departure_times": departure_times,
+        "late_packages": late_packages,
+        "total_lateness": total_lateness,
+        "truck_timelines": truck_timelines
+    }
+
+
+# Space-Time Complexity: O(N)
+# Returns a list of descriptions of every constraint of the problem that the plan breaks
+def find_plan_violations(problem, plan):
+    violations = []
+    packages = problem["packages"]
+    trip_of_package = {}
+
+    for truck_id, trips in plan.items():
+        capacity = problem["trucks"][truck_id]["capacity"]
+
+        for trip_index, trip in enumerate(trips):
+            if len(trip) > capacity:
+                violations.append("Truck %d trip %d carries %d packages, capacity is %d" %
+                                  (truck_id, trip_index + 1, len(trip), capacity))
+
+            for package_id in trip:
+                if package_id in trip_of_package:
+                    violations.append("Package %d is delivered more than once" % package_id)
+                trip_of_package[package_id] = (truck_id, trip_index)
+
+                required_truck = packages[package_id]["required_truck"]
+                if required_truck is not None and required_truck != truck_id:
+                    violations.append("Package %d can only be on truck %d" % (package_id, required_truck))
+
+    for package_id in packages:
+        if package_id not in trip_of_package:
+            violations.append("Package %d is never delivered" % package_id)
+
+    # Packages that must be delivered together must share the same Truck and the same delivery trip
+    for group in problem["groups"]:
+        group_trips = set(trip_of_package.get(package_id) for package_id in group)
+        if len(group_trips) > 1:
+            violations.append("Packages %s are not delivered together" % ", ".join(str(i) for i in group))
+
+    return violations
+
+
+# Space-Time Complexity: O(N)
+# Writes the simulated plan back into the Packages in the HashTable and the Trucks so that the reports and queries
+# reflect the plan. Every simulated event is also recorded when an event log is provided, and the projected arrivals
+# of every trip are recorded when a DeadlineRiskTracker is provided
+def apply_plan(ht, truck_list, problem, plan, event_log=None, risk_tracker=None):
+    simulation = simulate_plan(problem, plan, risk_tracker)
+
+    for truck_id, trips in plan.items():
+        for trip in trips:
+            for package_id in trip:
+                package = ht.lookup(package_id)
+                package.assigned_truck_id = truck_id
+                package.delivery_status = "Delivered"
+                package.en_route_timestamp = simulation["departure_times"][package_id]
+                package.delivery_timestamp = simulation["delivery_times"][package_id]
+
+    for truck in truck_list:
+        timeline = simulation["truck_timelines"].get(truck.id)
+        if timeline is not None:
+            truck.mileage_timestamps = timeline
+            truck.mileage = timeline[len(timeline) - 1][0]
+            truck.time_obj = timeline[len(timeline) - 1][1]
+            truck.packages_id_list = []
+
+            if event_log is not None:
+                log_truck_events(event_log, ht, truck, plan[truck.id], timeline)
+
+    return simulation
+
+
+# Space-Time Complexity: O(N)
+# Records the load, departure, delivery and return events of every trip of the Truck in the event log, and the
+# address correction of a corrected Package when it is loaded, as the greedy simulation does. The timeline holds the
+# starting point followed by one entry per delivery and one entry per return to the hub
+def log_truck_events(event_log, ht, truck, trips, timeline):
+    from event_log import event_correction, event_deliver, event_depart, event_load, event_return
+
+    timeline_index = 1
+    for trip in trips:
+        if len(trip) == 0:
+            continue
+
+        # The Truck is loaded at the hub and departs once every Package on the trip is available
+        hub_mileage = timeline[timeline_index - 1][0]
+        for package_id in trip:
+            package = ht.lookup(package_id)
+            departure_time = package.en_route_timestamp
+            event_log.write_event(event_load, truck.id, package_id, departure_time, hub_mileage)
+            if package_id in address_corrections:
+                event_log.write_event(event_correction, truck.id, package_id, package.get_delayed_arrival_time(),
+                                      hub_mileage)
+            event_log.write_event(event_depart, truck.id, package_id, departure_time, hub_mileage)
+
+        for package_id in trip:
+            mileage, delivery_time = timeline[timeline_index]
+            event_log.write_event(event_deliver, truck.id, package_id, delivery_time, mileage)
+            timeline_index = timeline_index + 1
+
+        mileage, return_time = timeline[timeline_index]
+        event_log.write_event(event_return, truck.id, 0, return_time, mileage)
+        timeline_index = timeline_index + 1
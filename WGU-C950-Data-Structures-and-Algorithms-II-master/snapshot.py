@@ -0,0 +1,131 @@
+import hashlib
+import os
+import pickle
+
+# CSV files that the snapshots are compiled from. A snapshot is only used while these files are unchanged
+input_files = ("addresses.csv", "distances.csv", "packages.csv")
+
+# Source files of the planner. A plan snapshot is only used while the planner that computed it is unchanged
+planner_files = ("main.py", "Package.py", "Truck.py", "Driver.py", "HashTable.py", "route_plan.py", "optimizer.py",
+                 "exact_solver.py", "TravelTimeModel.py")
+
+# Version of the snapshot layout, bumped whenever the layout changes
+snapshot_format = 3
+
+# Path of the snapshot of the computed plan
+plan_snapshot_path = "plan.snapshot"
+
+
+# Space-Time Complexity: O(1)
+# Returns the modification time and size of every input file, used to detect a snapshot that is out of date
+def get_input_signature():
+    signature = []
+    for file_name in input_files:
+        file_stat = os.stat(file_name)
+        signature.append((file_name, file_stat.st_mtime_ns, file_stat.st_size))
+    return signature
+
+
+# Space-Time Complexity: O(S) where S is the size of the planner source files
+# Returns a hash of the planner source files, used to detect a plan snapshot computed by another version of the code
+def get_planner_version():
+    digest = hashlib.sha256()
+    for file_name in planner_files:
+        with open(file_name, "rb") as source_file:
+            digest.update(source_file.read())
+    return digest.hexdigest()
+
+
+# Space-Time Complexity: O(N^2)
+# Parses the addresses, distances and Package rows from the CSV files
+def parse_input_data():
+    from main import load_address_data, load_distance_data, parse_package_rows
+
+    addresses = load_address_data()
+
+    # Map every address to its index in the distance table, keeping the first index of a repeated address
+    address_index = {}
+    for index, address in enumerate(addresses):
+        address_index.setdefault(address, index)
+
+    return {
+        "addresses": addresses,
+        "address_index": address_index,
+        "distances": load_distance_data(),
+        "package_rows": parse_package_rows()
+    }
+
+
+# Space-Time Complexity: O(N)
+# Returns the contents of a snapshot compiled from the current input files, or None if the snapshot is missing,
+# unreadable or out of date
+def read_snapshot(path):
+    try:
+        with open(path, "rb") as snapshot_file:
+            contents = pickle.loads(snapshot_file.read())
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+
+    if contents.get("format") != snapshot_format or contents.get("signature") != get_input_signature():
+        return None
+    return contents
+
+
+# Space-Time Complexity: O(N)
+# Writes the data to a snapshot tagged with the signature of the current input files. The snapshot is written to a
+# temporary file first so that a reader never sees a partially written snapshot
+def write_snapshot(path, data):
+    contents = {"format": snapshot_format, "signature": get_input_signature(), "data": data}
+
+    temporary_path = path + ".tmp"
+    with open(temporary_path, "wb") as snapshot_file:
+        snapshot_file.write(pickle.dumps(contents, protocol=pickle.HIGHEST_PROTOCOL))
+    os.replace(temporary_path, path)
+
+
+# Space-Time Complexity: O(N^2)
+# Parses the input files and compiles them into a snapshot. Returns the parsed input data
+def compile_input_snapshot(path):
+    data = parse_input_data()
+    write_snapshot(path, data)
+    return data
+
+
+# Space-Time Complexity: O(N) with an up to date snapshot, O(N^2) otherwise
+# Returns the parsed input data with a single read of the snapshot, falling back to the CSV files when the
+# snapshot is missing or out of date
+def load_input_data(path):
+    contents = read_snapshot(path)
+    if contents is not None:
+        return contents["data"]
+    return parse_input_data()
+
+
+# Space-Time Complexity: O(N)
+# Saves the HashTable and the Trucks of a computed plan so that queries and reports can be answered without
+# planning again. The plan is tagged with the version of the planner and the planner configuration it was computed
+# with
+def save_plan_snapshot(path, ht, truck_list, planner_config=None):
+    write_snapshot(path, {"ht": ht, "truck_list": truck_list,
+                          "planner": {"version": get_planner_version(), "config": planner_config}})
+
+
+# Space-Time Complexity: O(N)
+# Returns the HashTable and the Trucks of the saved plan, or None if there is no up to date plan snapshot. A plan
+# computed by another version of the planner or with another planner configuration is out of date
+def load_plan_snapshot(path, planner_config=None):
+    contents = read_snapshot(path)
+    if contents is None:
+        return None
+
+    planner = {"version": get_planner_version(), "config": planner_config}
+    if contents["data"].get("planner") != planner:
+        return None
+    return contents["data"]["ht"], contents["data"]["truck_list"]
+
+
+if __name__ == "__main__":
+    from main import input_snapshot_path
+
+    compile_input_snapshot(input_snapshot_path)
+    print("Compiled the input files into " + input_snapshot_path)
@@ -0,0 +1,300 @@
+import argparse
+import asyncio
+import json
+import sys
+import threading
+import time
+import traceback
+from datetime import datetime, timedelta
+from urllib.parse import parse_qs, urlsplit
+
+from DeadlineRiskTracker import DeadlineRiskTracker
+from main import build_delivery_plan, get_package_status_at_time, get_truck_mileage_at_time, refresh_input_data
+from PackageStore import PackageStore, freeze_package, freeze_truck
+
+# Address and port that the status service listens on
+server_host = "127.0.0.1"
+server_port = 8950
+
+# Maximum size of a request line or header line accepted from a client, longer lines are answered with a 400
+max_line_length = 8192
+
+# Number of at-risk Packages returned by '/risk' unless the client asks for a different number
+default_risk_count = 10
+
+
+# Space-Time Complexity: O(1)
+# Converts a time provided in the format [HOUR:MINUTE] (24-hour clock) to a timedelta. Returns None if invalid
+def parse_query_time(time_text):
+    try:
+        timestamp = datetime.strptime(time_text, "%H:%M")
+    except (TypeError, ValueError):
+        return None
+    return timedelta(hours=timestamp.hour, minutes=timestamp.minute)
+
+
+# Space-Time Complexity: O(1)
+# Converts a timedelta to a String in the format [HOUR:MINUTE] (24-hour clock)
+def format_query_time(time_delta):
+    if time_delta is None:
+        return None
+    total_minutes = int(time_delta.total_seconds()) // 60
+    return "%02d:%02d" % (total_minutes // 60, total_minutes % 60)
+
+
+# Space-Time Complexity: O(1)
+# Returns the status information of the Package at the specified time as a dictionary
+def package_status_response(view, package_id, report_timedelta):
+    package = view.lookup(package_id)
+    if package is None:
+        return 404, {"error": "No package found with the provided ID."}
+
+    delivery_status, status_timestamp = get_package_status_at_time(package, report_timedelta)
+
+    return 200, {
+        "id": package.id_number,
+        "at": format_query_time(report_timedelta),
+        "status": delivery_status,
+        "delivery_time": format_query_time(status_timestamp),
+        "truck": package.assigned_truck_id,
+        "address": package.delivery_address,
+        "city": package.delivery_city,
+        "zip": package.delivery_zip,
+        "weight": package.package_mass,
+        "deadline": package.delivery_deadline
+    }
+
+
+# Space-Time Complexity: O(T log N)
+# Returns the mileage of every Truck and the total mileage at the specified time as a dictionary
+def fleet_status_response(truck_list, report_timedelta):
+    trucks = []
+    total_mileage = 0
+
+    for truck in truck_list:
+        truck_mileage = get_truck_mileage_at_time(truck, report_timedelta)
+        total_mileage += truck_mileage
+        trucks.append({"id": truck.id, "mileage": round(truck_mileage, 2)})
+
+    return 200, {"at": format_query_time(report_timedelta), "trucks": trucks,
+                 "total_mileage": round(total_mileage, 2)}
+
+
+# Space-Time Complexity: O(N log N)
+# Returns the deadline risk summary and every tracked Package ordered by slack, most at risk first, read from the
+# DeadlineRiskTracker that followed the plan while it was built. They are published with the view of the plan, so
+# requests only read them
+def build_risk_attachments(risk_tracker):
+    summary = risk_tracker.get_summary()
+    return {"risk_summary": summary, "risk_ranking": tuple(risk_tracker.get_most_at_risk(summary["tracked"]))}
+
+
+# Space-Time Complexity: O(K)
+# Returns the deadline risk summary and the K Packages with the smallest slack as a dictionary
+def risk_status_response(view, count):
+    summary = view.attachments["risk_summary"]
+    min_slack = summary["min_slack"]
+
+    return 200, {
+        "tracked": summary["tracked"],
+        "late_count": summary["late_count"],
+        "total_lateness_minutes": round(summary["total_lateness"].total_seconds() / 60, 2),
+        "min_slack_minutes": round(min_slack.total_seconds() / 60, 2) if min_slack is not None else None,
+        "most_at_risk": [{"id": package_id, "slack_minutes": round(slack.total_seconds() / 60, 2)}
+                         for package_id, slack in view.attachments["risk_ranking"][:count]]
+    }
+
+
+# Space-Time Complexity: O(1)
+# Routes a request path such as '/package/{id}?at=HH:MM', '/fleet?at=HH:MM' or '/risk?top=N' to the matching
+# response. Every request is answered from a single view of the plan
+def route_request(view, method, target):
+    if method != "GET":
+        return 405, {"error": "Only GET requests are supported."}
+
+    url = urlsplit(target)
+    path_parts = [part for part in url.path.split("/") if part != ""]
+    query = parse_qs(url.query)
+
+    # The deadline risk does not depend on the time of the day
+    if len(path_parts) == 1 and path_parts[0] == "risk":
+        count = query.get("top", [str(default_risk_count)])[0]
+        if not count.isdigit():
+            return 400, {"error": "Invalid number of packages."}
+        return risk_status_response(view, int(count))
+
+    # Every other query is answered for a specific time of the day
+    report_timedelta = parse_query_time(query.get("at", [None])[0])
+    if report_timedelta is None:
+        return 400, {"error": "Invalid time format. Provide ?at=HH:MM"}
+
+    if len(path_parts) == 2 and path_parts[0] == "package":
+        if not path_parts[1].isdigit():
+            return 400, {"error": "Invalid package ID."}
+        return package_status_response(view, int(path_parts[1]), report_timedelta)
+
+    if len(path_parts) == 1 and path_parts[0] == "fleet":
+        return fleet_status_response(view.truck_list, report_timedelta)
+
+    return 404, {"error": "Unknown path."}
+
+
+# Space-Time Complexity: O(N)
+# Encodes a status code and a dictionary into a HTTP/1.1 JSON response
+def build_http_response(status_code, body, keep_alive):
+    reasons = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed"}
+    payload = json.dumps(body).encode()
+
+    headers = "HTTP/1.1 %d %s\r\n" % (status_code, reasons.get(status_code, "Error"))
+    headers += "Content-Type: application/json\r\n"
+    headers += "Content-Length: %d\r\n" % len(payload)
+    headers += "Connection: %s\r\n\r\n" % ("keep-alive" if keep_alive else "close")
+
+    return headers.encode() + payload
+
+
+# Serves requests from a single client connection. The plan is only read from memory, so a request is answered
+# without yielding to the event loop and no client can block another one
+async def handle_client(store, reader, writer):
+    try:
+        keep_alive = True
+
+        while keep_alive:
+            # The reader is limited to max_line_length, a longer line raises a ValueError (a LimitOverrunError
+            # from readuntil) and the rest of the connection can no longer be parsed
+            try:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+
+                # Read the headers until the blank line that ends the request
+                request_headers = {}
+                while True:
+                    header_line = await reader.readline()
+                    if header_line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = header_line.decode("latin-1").partition(":")
+                    request_headers[name.strip().lower()] = value.strip().lower()
+            except (ValueError, asyncio.LimitOverrunError):
+                writer.write(build_http_response(400, {"error": "Request line or header too long."}, False))
+                await writer.drain()
+                break
+
+            request_parts = request_line.decode("latin-1").split()
+            if len(request_parts) != 3:
+                writer.write(build_http_response(400, {"error": "Malformed request."}, False))
+                break
+
+            method, target, version = request_parts
+            keep_alive = request_headers.get("connection", "") != "close" and version == "HTTP/1.1"
+
+            status_code, body = route_request(store.get_view(), method, target)
+            writer.write(build_http_response(status_code, body, keep_alive))
+            await writer.drain()
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+# Plans the day and publishes the plan to the store. The DeadlineRiskTracker is kept by the single writer across
+# plans, so a new plan only records the trips that changed
+def publish_plan(store, risk_tracker):
+    delivery_ht, truck_list = build_delivery_plan(risk_tracker=risk_tracker)
+    return store.publish(delivery_ht, truck_list, build_risk_attachments(risk_tracker))
+
+
+# Space-Time Complexity: O(N^5)
+# Plans the day again, reading the input files again if they changed, and publishes only the Packages and Trucks
+# whose records changed. Every other record is shared with the previous view. A plan that adds or drops Packages is
+# published as a whole
+def publish_replan(store, risk_tracker):
+    refresh_input_data()
+    delivery_ht, truck_list = build_delivery_plan(risk_tracker=risk_tracker)
+    attachments = build_risk_attachments(risk_tracker)
+
+    view = store.get_view()
+    packages = [package for package in delivery_ht.package_table if package is not None]
+    if len(packages) != len(view) or any(view.lookup(package.id_number) is None for package in packages):
+        return store.publish(delivery_ht, truck_list, attachments)
+
+    changed_packages = [package for package in packages if freeze_package(package) != view.lookup(package.id_number)]
+    changed_trucks = [truck for truck in truck_list if freeze_truck(truck) not in view.truck_list]
+    return store.publish_changes(changed_packages, changed_trucks, attachments)
+
+
+# Single writer: plans the day again every replan_interval seconds and publishes each new plan. Requests keep being
+# answered from the previous view while the new plan is being computed, and keep being answered from it when
+# planning fails
+def replan_periodically(store, risk_tracker, replan_interval):
+    while True:
+        time.sleep(replan_interval)
+        try:
+            publish_replan(store, risk_tracker)
+        except Exception:
+            print("Replanning failed, the previous plan is still served:", file=sys.stderr)
+            traceback.print_exc()
+
+
+# Loads and plans the deliveries and serves status queries until the server is stopped. When a replan interval is
+# provided, the plan is kept up to date by a separate writer thread
+async def serve_status_queries(host, port, replan_interval=None):
+    # Plan the day, every request is then answered from the in-memory view of the plan
+    store = PackageStore()
+    risk_tracker = DeadlineRiskTracker({})
+    publish_plan(store, risk_tracker)
+
+    if replan_interval is not None:
+        threading.Thread(target=replan_periodically, args=(store, risk_tracker, replan_interval),
+                         daemon=True).start()
+
+    server = await asyncio.start_server(lambda reader, writer: handle_client(store, reader, writer), host, port,
+                                        limit=max_line_length)
+
+    print("Serving package status queries on http://%s:%d" % (host, port))
+    async with server:
+        await server.serve_forever()
+
+
+# Space-Time Complexity: O(1)
+# Converts a port number to an int, which must be between 1 and 65535
+def parse_port_argument(port_text):
+    try:
+        port = int(port_text)
+    except ValueError:
+        port = None
+    if port is None or port < 1 or port > 65535:
+        raise argparse.ArgumentTypeError("invalid port '%s', expected a number from 1 to 65535" % port_text)
+    return port
+
+
+# Space-Time Complexity: O(1)
+# Converts a replan interval in seconds to a float, which must be positive
+def parse_interval_argument(interval_text):
+    try:
+        interval = float(interval_text)
+    except ValueError:
+        interval = None
+    if interval is None or interval <= 0:
+        raise argparse.ArgumentTypeError("invalid interval '%s', expected a positive number of seconds" % interval_text)
+    return interval
+
+
+# Space-Time Complexity: O(1)
+# Builds the command line parser, the port and the replan interval are optional
+def build_argument_parser():
+    parser = argparse.ArgumentParser(description="Serves package status queries over HTTP")
+    parser.add_argument("port", nargs="?", type=parse_port_argument, default=server_port,
+                        help="port to listen on (default: %d)" % server_port)
+    parser.add_argument("replan_seconds", nargs="?", type=parse_interval_argument, metavar="replan_interval",
+                        help="plan again every this many seconds to pick up changes to the input files")
+    return parser
+
+
+if __name__ == "__main__":
+    arguments = build_argument_parser().parse_args()
+
+    try:
+        asyncio.run(serve_status_queries(server_host, arguments.port, arguments.replan_seconds))
+    except KeyboardInterrupt:
+        print("The server will now close.")
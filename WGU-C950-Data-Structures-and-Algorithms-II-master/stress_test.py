@@ -0,0 +1,329 @@
+import argparse
+import random
+import sys
+import time
+
+from HashTable import HashTable
+from Package import Package
+
+# Number of HashTable operations between two samples of the probe lengths and load factor
+sample_interval = 1000
+
+# Special notes understood by the planner, used to generate random manifests
+delayed_note = "Delayed on flight---will not arrive to depot until %s am"
+required_truck_note = "Can only be on truck %d"
+delivered_with_note = "Must be delivered with %s"
+
+# Deadlines used to generate random manifests
+manifest_deadlines = ("EOD", "EOD", "EOD", "9:00 AM", "10:30 AM")
+
+
+# Space-Time Complexity: O(1)
+# Returns a Package that only has an ID, used as the item stored in the HashTable
+def make_package(package_id):
+    return Package(package_id, "", "", "", "", "EOD", 0, "", "At the hub")
+
+
+# Space-Time Complexity: O(1)
+# Returns a random key. Most keys are consecutive IDs, like Package IDs, which fill a dense block of home buckets.
+# The other keys are drawn from a fixed set of large random IDs whose home buckets are spread over the whole table
+# and collide with the dense block. Both sets are bounded so that keys are inserted, updated and removed many times
+def choose_key(rng, key_range, sparse_keys):
+    if rng.random() < 0.2:
+        return rng.choice(sparse_keys)
+    return rng.randrange(key_range)
+
+
+# Space-Time Complexity: O(N)
+# Returns the number of distinct buckets that the probe sequence of a key visits before it repeats itself
+def get_probe_coverage(ht):
+    return len(set(ht.get_bucket(0, i) for i in range(len(ht.package_table))))
+
+
+# Space-Time Complexity: O(N)
+# Compares every bucket of the HashTable with the oracle. Returns a list of the differences
+def check_hash_table(ht, oracle):
+    failures = []
+
+    if len(ht) != len(oracle):
+        failures.append("HashTable holds %d items, the oracle holds %d" % (len(ht), len(oracle)))
+
+    occupied_keys = []
+    for bucket, package in enumerate(ht.package_table):
+        if ht.bucket_status_table[bucket] == "OCCUPIED":
+            occupied_keys.append(package.id_number)
+        elif package is not None:
+            failures.append("Bucket %d holds a package but is marked %s" % (bucket, ht.bucket_status_table[bucket]))
+
+    if len(occupied_keys) != len(set(occupied_keys)):
+        failures.append("A key is stored in more than one bucket")
+
+    for key, package in oracle.items():
+        if ht.lookup(key) is not package:
+            failures.append("Lookup of key %d does not return the last inserted package" % key)
+
+    return failures
+
+
+# Space-Time Complexity: O(K) where K is the number of operations
+# Runs random insert, lookup and remove operations against the HashTable and a dictionary used as the oracle. The
+# operations alternate between insert-heavy and remove-heavy phases so that the HashTable both grows and is filled
+# with removed buckets. Returns the failures and the probe length and load factor statistics
+def stress_hash_table(num_operations, seed, key_range):
+    rng = random.Random(seed)
+    sparse_keys = [rng.randrange(key_range, 2 ** 31) for index in range(key_range)]
+    ht = HashTable()
+    oracle = {}
+    failures = []
+
+    probe_lengths = {"hit": [], "miss": []}
+    load_factors = []
+    table_sizes = set()
+    operation_counts = {"insert": 0, "lookup": 0, "remove": 0}
+
+    for operation_index in range(num_operations):
+        # Insert-heavy and remove-heavy phases alternate every key_range operations
+        insert_share = 0.6 if (operation_index // key_range) % 2 == 0 else 0.2
+        roll = rng.random()
+        key = choose_key(rng, key_range, sparse_keys)
+
+        if roll < insert_share:
+            package = make_package(key)
+            ht.insert(package)
+            oracle[key] = package
+            operation_counts["insert"] += 1
+        elif roll < insert_share + 0.4:
+            if ht.lookup(key) is not oracle.get(key):
+                failures.append("Operation %d: lookup of key %d disagrees with the oracle" % (operation_index, key))
+            operation_counts["lookup"] += 1
+        else:
+            if ht.remove(key) is not oracle.pop(key, None):
+                failures.append("Operation %d: remove of key %d disagrees with the oracle" % (operation_index, key))
+            operation_counts["remove"] += 1
+
+        # A new table size must keep the guarantee that an empty bucket is found while the table is half full
+        if len(ht.package_table) not in table_sizes:
+            table_sizes.add(len(ht.package_table))
+            if get_probe_coverage(ht) * 2 < len(ht.package_table):
+                failures.append("Probe sequence of a %d bucket table visits only %d buckets" %
+                                (len(ht.package_table), get_probe_coverage(ht)))
+
+        if operation_index % sample_interval == 0:
+            load_factors.append(ht.get_load_factor())
+            if len(oracle) > 0:
+                probe_lengths["hit"].append(ht.get_probe_length(rng.choice(list(oracle))))
+            probe_lengths["miss"].append(ht.get_probe_length(-1 - rng.randrange(key_range)))
+
+            if len(ht) != len(oracle):
+                failures.append("Operation %d: HashTable holds %d items, the oracle holds %d" %
+                                (operation_index, len(ht), len(oracle)))
+
+        if len(failures) > 20:
+            break
+
+    failures.extend(check_hash_table(ht, oracle))
+
+    return {
+        "failures": failures,
+        "operation_counts": operation_counts,
+        "probe_lengths": probe_lengths,
+        "load_factors": load_factors,
+        "table_sizes": sorted(table_sizes)
+    }
+
+
+# Space-Time Complexity: O(N)
+# Returns a random manifest of Package rows in the format of the 'packages.csv' file. Some Packages must be on a
+# specific Truck, some arrive late at the depot and some must be delivered together. The notes never combine in a way
+# that cannot be planned, e.g. a group of Packages is never split between required Trucks
+def generate_manifest(rng, num_packages, addresses, num_trucks):
+    package_ids = list(range(1, num_packages + 1))
+    notes = {package_id: "" for package_id in package_ids}
+
+    # Every Package that arrives late arrives at the same time, which is when the last Truck starts its day
+    delayed_time = "%d:%02d" % (rng.choice((8, 9)), rng.randrange(5, 60, 5))
+
+    free_ids = list(package_ids)
+    rng.shuffle(free_ids)
+
+    for group_index in range(rng.randrange(3)):
+        group = [free_ids.pop() for member in range(rng.randrange(2, 5))]
+        notes[group[0]] = delivered_with_note % ", ".join(str(package_id) for package_id in group[1:])
+        for package_id in group[1:]:
+            if rng.random() < 0.5:
+                notes[package_id] = delivered_with_note % group[0]
+
+    for package_id in free_ids:
+        roll = rng.random()
+        if roll < 0.1:
+            notes[package_id] = required_truck_note % rng.randrange(1, num_trucks + 1)
+        elif roll < 0.2:
+            notes[package_id] = delayed_note % delayed_time
+
+    rows = []
+    for package_id in package_ids:
+        rows.append([str(package_id), rng.choice(addresses), "Salt Lake City", "UT", "84101",
+                     rng.choice(manifest_deadlines), str(rng.randrange(1, 90)), notes[package_id]])
+    return rows
+
+
+# Space-Time Complexity: O(N^2)
+# Checks the invariants of the plan simulated into the HashTable: every Package is delivered exactly once, no trip
+# carries more Packages than the Truck's capacity, required Trucks and delivered-with notes are honoured and no
+# Package leaves the hub before it arrives there. Returns a list of the broken invariants
+def check_plan_invariants(ht, truck_list, manifest_rows):
+    from route_plan import build_routing_problem
+
+    failures = []
+    problem = build_routing_problem(ht, truck_list)
+    capacities = {truck.id: truck.capacity for truck in truck_list}
+
+    trips = {}
+    delivered_ids = []
+    for package in ht.package_table:
+        if package is None:
+            continue
+        if package.delivery_timestamp is None or package.en_route_timestamp is None:
+            failures.append("Package %d is never delivered" % package.id_number)
+            continue
+
+        delivered_ids.append(package.id_number)
+        trips.setdefault((package.assigned_truck_id, package.en_route_timestamp), []).append(package.id_number)
+
+        if package.en_route_timestamp < problem["packages"][package.id_number]["available"]:
+            failures.append("Package %d leaves the hub before it arrives" % package.id_number)
+        if package.delivery_timestamp < package.en_route_timestamp:
+            failures.append("Package %d is delivered before it leaves the hub" % package.id_number)
+
+        required_truck = problem["packages"][package.id_number]["required_truck"]
+        if required_truck is not None and required_truck != package.assigned_truck_id:
+            failures.append("Package %d can only be on truck %d" % (package.id_number, required_truck))
+
+    if sorted(delivered_ids) != sorted(int(row[0]) for row in manifest_rows):
+        failures.append("Delivered packages do not match the manifest")
+
+    for (truck_id, departure_time), trip in trips.items():
+        if len(trip) > capacities[truck_id]:
+            failures.append("Truck %d carries %d packages at %s, capacity is %d" %
+                            (truck_id, len(trip), departure_time, capacities[truck_id]))
+
+    trip_of_package = {package_id: trip_key for trip_key, trip in trips.items() for package_id in trip}
+    for group in problem["groups"]:
+        if len(set(trip_of_package.get(package_id) for package_id in group)) > 1:
+            failures.append("Packages %s are not delivered together" % ", ".join(str(i) for i in group))
+
+    return failures
+
+
+# Plans random manifests with the greedy planner, the exact post-pass and the optimizer, and checks the invariants
+# of every plan. Returns the failures and the number of plans checked
+def stress_planner(num_manifests, seed, optimizer_iterations):
+    import main
+    from exact_solver import exact_post_pass
+    from optimizer import optimize_plan
+    from route_plan import apply_plan, build_routing_problem, extract_plan, find_plan_violations
+
+    rng = random.Random(seed)
+    real_input_data = main.get_input_data()
+    hub_address = real_input_data["addresses"][0]
+    addresses = [address for address in real_input_data["address_index"] if address != hub_address]
+
+    failures = []
+    plans_checked = 0
+
+    try:
+        for manifest_index in range(num_manifests):
+            manifest_rows = generate_manifest(rng, rng.randrange(10, 61), addresses,
+                                              min(main.num_trucks, main.num_drivers))
+            main.input_data = dict(real_input_data, package_rows=manifest_rows)
+
+            def record(strategy, strategy_failures):
+                failures.extend("Manifest %d (%s): %s" % (manifest_index, strategy, failure)
+                                for failure in strategy_failures)
+
+            # A manifest that makes the planner raise an error is a failure, the remaining manifests are still run
+            try:
+                # Greedy plan
+                delivery_ht, truck_list = main.build_delivery_plan()
+                record("greedy", check_plan_invariants(delivery_ht, truck_list, manifest_rows))
+
+                # Exact post-pass and optimizer, checked both as a plan and once simulated into the HashTable
+                problem = build_routing_problem(delivery_ht, truck_list)
+                greedy_plan = extract_plan(delivery_ht, truck_list)
+                improved_plans = [
+                    ("exact", exact_post_pass(problem, greedy_plan)),
+                    ("optimizer", optimize_plan(problem, greedy_plan, time_budget=60, seed=manifest_index,
+                                                max_iterations=optimizer_iterations)[0])
+                ]
+
+                for strategy, plan in improved_plans:
+                    record(strategy, find_plan_violations(problem, plan))
+                    apply_plan(delivery_ht, truck_list, problem, plan)
+                    record(strategy, check_plan_invariants(delivery_ht, truck_list, manifest_rows))
+
+                plans_checked += 1 + len(improved_plans)
+            except Exception as error:
+                record("planner", ["raised %s: %s" % (type(error).__name__, str(error)[:200])])
+    finally:
+        main.input_data = real_input_data
+
+    return {"failures": failures, "plans_checked": plans_checked}
+
+
+# Space-Time Complexity: O(N log N)
+# Returns the mean, median, 99th percentile and maximum of the values
+def summarize(values):
+    if len(values) == 0:
+        return "no samples"
+    ordered = sorted(values)
+    return "mean %0.2f, median %0.2f, p99 %0.2f, max %0.2f" % (
+        sum(ordered) / len(ordered), ordered[len(ordered) // 2], ordered[int(len(ordered) * 0.99)], ordered[-1])
+
+
+# Space-Time Complexity: O(F) where F is the number of failures
+# Prints up to ten failures and returns True if there were none
+def print_failures(failures):
+    for failure in failures[:10]:
+        print("\tFAIL " + failure)
+    if len(failures) > 10:
+        print("\t... %d more failures" % (len(failures) - 10))
+    return len(failures) == 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Randomized stress and property tests of the HashTable and the "
+                                                 "planner")
+    parser.add_argument("--operations", type=int, default=1000000, help="number of HashTable operations")
+    parser.add_argument("--key-range", type=int, default=5000, help="number of distinct HashTable keys")
+    parser.add_argument("--manifests", type=int, default=20, help="number of random manifests to plan")
+    parser.add_argument("--optimizer-iterations", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=1)
+    arguments = parser.parse_args(argv)
+
+    passed = True
+
+    if arguments.operations > 0:
+        start = time.perf_counter()
+        results = stress_hash_table(arguments.operations, arguments.seed, arguments.key_range)
+        print("HashTable: %d operations (%d inserts, %d lookups, %d removes) in %0.1f seconds" % (
+            arguments.operations, results["operation_counts"]["insert"], results["operation_counts"]["lookup"],
+            results["operation_counts"]["remove"], time.perf_counter() - start))
+        print("\tProbe length of a stored key: " + summarize(results["probe_lengths"]["hit"]))
+        print("\tProbe length of a missing key: " + summarize(results["probe_lengths"]["miss"]))
+        print("\tLoad factor: " + summarize(results["load_factors"]))
+        print("\tTable sizes: " + ", ".join(str(size) for size in results["table_sizes"]))
+        passed = print_failures(results["failures"]) and passed
+
+    if arguments.manifests > 0:
+        start = time.perf_counter()
+        results = stress_planner(arguments.manifests, arguments.seed, arguments.optimizer_iterations)
+        print("Planner: %d plans of %d random manifests checked in %0.1f seconds" % (
+            results["plans_checked"], arguments.manifests, time.perf_counter() - start))
+        passed = print_failures(results["failures"]) and passed
+
+    print("PASSED" if passed else "FAILED")
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())